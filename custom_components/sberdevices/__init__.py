@@ -2,23 +2,59 @@
 
 from __future__ import annotations
 
+from datetime import timedelta
+
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.device_registry import DeviceEntry
 
+from .const import (
+    CONF_COMPACT_SNAPSHOT,
+    CONF_MAX_POLL_INTERVAL,
+    CONF_MIN_POLL_INTERVAL,
+    DEFAULT_MAX_POLL_INTERVAL,
+    DEFAULT_MIN_POLL_INTERVAL,
+    DOMAIN,
+)
 from .core.auth import SberAuthClient
 from .core.coordinator import SberDataUpdateCoordinator
 from .core.gateway import SberHomeGatewayClient
-from .core.runtime import SberConfigEntry, SberRuntimeData
+from .core.runtime import (
+    SberConfigEntry,
+    SberRuntimeData,
+    async_acquire_polling_engine,
+    async_release_polling_engine,
+)
+from .core.storage import snapshot_store
+
+PLATFORMS: list[Platform] = [Platform.LIGHT, Platform.SENSOR, Platform.SWITCH]
 
-PLATFORMS: list[Platform] = [Platform.LIGHT, Platform.SWITCH]
+
+def _poll_interval(entry: SberConfigEntry, key: str, default: timedelta) -> timedelta:
+    seconds = entry.options.get(key)
+    return default if seconds is None else timedelta(seconds=seconds)
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: SberConfigEntry) -> bool:
     """Set up SberDevices from a config entry."""
 
-    auth_client = SberAuthClient(token=entry.data["token"])
+    # Accounts share the connection pool and poll budget; tokens stay with each entry's own clients.
+    polling_engine = await async_acquire_polling_engine(hass, entry.entry_id)
+    try:
+        auth_client = await SberAuthClient.async_create(token=entry.data["token"], transport=polling_engine.transport)
+    except Exception:
+        await async_release_polling_engine(hass, entry.entry_id)
+        raise
     gateway_client = SberHomeGatewayClient(auth_client)
-    coordinator = SberDataUpdateCoordinator(hass, gateway_client)
+    coordinator = SberDataUpdateCoordinator(
+        hass,
+        entry,
+        gateway_client,
+        min_interval=_poll_interval(entry, CONF_MIN_POLL_INTERVAL, DEFAULT_MIN_POLL_INTERVAL),
+        max_interval=_poll_interval(entry, CONF_MAX_POLL_INTERVAL, DEFAULT_MAX_POLL_INTERVAL),
+        compact=entry.options.get(CONF_COMPACT_SNAPSHOT, False),
+        polling_engine=polling_engine,
+    )
     entry.runtime_data = SberRuntimeData(
         auth_client=auth_client,
         gateway_client=gateway_client,
@@ -26,22 +62,60 @@ async def async_setup_entry(hass: HomeAssistant, entry: SberConfigEntry) -> bool
     )
 
     try:
-        await coordinator.async_config_entry_first_refresh()
+        # Start from the cached snapshot when there is one so setup does not wait for the cloud.
+        restored = await coordinator.async_restore_snapshot()
+        if not restored:
+            await coordinator.async_config_entry_first_refresh()
         await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     except Exception:
         await entry.runtime_data.async_close()
+        await async_release_polling_engine(hass, entry.entry_id)
         raise
 
+    if restored:
+        entry.async_create_background_task(hass, coordinator.async_refresh(), f"{DOMAIN} initial refresh")
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
+    if gateway_client.supports_push:
+        entry.async_create_background_task(hass, coordinator.async_run_event_stream(), f"{DOMAIN} event stream")
+
     return True
 
 
+async def _async_update_listener(hass: HomeAssistant, entry: SberConfigEntry) -> None:
+    """Reload the config entry after its options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: SberConfigEntry) -> bool:
     """Unload a config entry."""
     if not await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
         return False
 
     await entry.runtime_data.async_close()
+    await async_release_polling_engine(hass, entry.entry_id)
     return True
 
 
-__all__ = ["PLATFORMS", "async_setup_entry", "async_unload_entry"]
+async def async_remove_config_entry_device(
+    hass: HomeAssistant, entry: SberConfigEntry, device_entry: DeviceEntry
+) -> bool:
+    """Allow removing a device the gateway no longer returns."""
+    serial_numbers = {device.serial_number for device in entry.runtime_data.coordinator.data.values()}
+    return not any(
+        domain == DOMAIN and (identifier in serial_numbers or identifier == entry.entry_id)
+        for domain, identifier in device_entry.identifiers
+    )
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: SberConfigEntry) -> None:
+    """Remove the cached snapshot of a deleted config entry."""
+    await snapshot_store(hass, entry.entry_id).async_remove()
+
+
+__all__ = [
+    "PLATFORMS",
+    "async_remove_config_entry_device",
+    "async_remove_entry",
+    "async_setup_entry",
+    "async_unload_entry",
+]
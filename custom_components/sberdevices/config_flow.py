@@ -7,9 +7,18 @@ from typing import Any
 import voluptuous as vol
 
 from homeassistant import config_entries
-from homeassistant.config_entries import ConfigFlowResult
+from homeassistant.config_entries import ConfigEntry, ConfigFlowResult, OptionsFlow
+from homeassistant.core import callback
 
-from .const import DOMAIN
+from .const import (
+    CONF_COMPACT_SNAPSHOT,
+    CONF_GROUP_LIGHTS,
+    CONF_MAX_POLL_INTERVAL,
+    CONF_MIN_POLL_INTERVAL,
+    DEFAULT_MAX_POLL_INTERVAL,
+    DEFAULT_MIN_POLL_INTERVAL,
+    DOMAIN,
+)
 from .core.auth import SberAuthClient
 
 STEP_USER_DATA_SCHEMA = vol.Schema(
@@ -18,6 +27,21 @@ STEP_USER_DATA_SCHEMA = vol.Schema(
     }
 )
 
+POLL_INTERVAL_SECONDS = vol.All(vol.Coerce(int), vol.Range(min=5, max=3600))
+
+OPTIONS_SCHEMA = vol.Schema(
+    {
+        vol.Required(
+            CONF_MIN_POLL_INTERVAL, default=int(DEFAULT_MIN_POLL_INTERVAL.total_seconds())
+        ): POLL_INTERVAL_SECONDS,
+        vol.Required(
+            CONF_MAX_POLL_INTERVAL, default=int(DEFAULT_MAX_POLL_INTERVAL.total_seconds())
+        ): POLL_INTERVAL_SECONDS,
+        vol.Optional(CONF_COMPACT_SNAPSHOT, default=False): bool,
+        vol.Optional(CONF_GROUP_LIGHTS, default=False): bool,
+    }
+)
+
 
 class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for SberDevices."""
@@ -26,10 +50,18 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     def __init__(self) -> None:
         super().__init__()
-        self._auth_client = SberAuthClient()
+        self._auth_client: SberAuthClient | None = None
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: ConfigEntry) -> OptionsFlow:
+        return OptionsFlowHandler()
 
     async def async_step_user(self, user_input: dict[str, Any] | None = None) -> ConfigFlowResult:
         """Handle the initial step."""
+        if self._auth_client is None:
+            self._auth_client = await SberAuthClient.async_create()
+
         errors: dict[str, str] = {}
         if user_input is not None:
             result = await self._auth_client.authorize_by_url(user_input["url"])
@@ -46,3 +78,22 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             },
             errors=errors,
         )
+
+
+class OptionsFlowHandler(OptionsFlow):
+    """Handle SberDevices options."""
+
+    async def async_step_init(self, user_input: dict[str, Any] | None = None) -> ConfigFlowResult:
+        """Manage polling options."""
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            if user_input[CONF_MIN_POLL_INTERVAL] > user_input[CONF_MAX_POLL_INTERVAL]:
+                errors["base"] = "invalid_poll_interval"
+            else:
+                return self.async_create_entry(data=user_input)
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=self.add_suggested_values_to_schema(OPTIONS_SCHEMA, user_input or self.config_entry.options),
+            errors=errors,
+        )
@@ -13,12 +13,70 @@ OAUTH_CLIENT_ID = "b1f0f0c6-fcb0-4ece-8374-6b614ebe3d42"
 GATEWAY_BASE_URL = "https://gateway.iot.sberdevices.ru/gateway/v1"
 COMPANION_TOKEN_URL = "https://companion.devices.sberbank.ru/v13/smarthome/token"
 
+# HTTP
+HTTP_MAX_CONNECTIONS = 20
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 10
+HTTP_KEEPALIVE_EXPIRY = timedelta(minutes=5)
+HTTP_CONNECT_TIMEOUT = timedelta(seconds=10)
+HTTP_DEFAULT_TIMEOUT = timedelta(seconds=20)
+DEVICE_TREE_TIMEOUT = timedelta(seconds=30)
+DEVICE_TREE_DEADLINE = timedelta(seconds=75)
+STATE_WRITE_TIMEOUT = timedelta(seconds=5)
+STATE_WRITE_DEADLINE = timedelta(seconds=10)
+TOKEN_TIMEOUT = timedelta(seconds=15)
+
+# Gateway failure handling
+REQUEST_RETRY_ATTEMPTS = 3
+REQUEST_RETRY_DELAY = (0.5, 5)
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_RESET_TIMEOUT = timedelta(seconds=30)
+CIRCUIT_HALF_OPEN_PROBES = 1
+
+# Gateway token
+GATEWAY_TOKEN_REFRESH_MARGIN = timedelta(minutes=5)
+GATEWAY_TOKEN_REFRESH_MIN_DELAY = timedelta(seconds=30)
+
 # Polling
 COORDINATOR_UPDATE_INTERVAL = timedelta(seconds=30)
+CONF_MIN_POLL_INTERVAL = "min_poll_interval"
+CONF_MAX_POLL_INTERVAL = "max_poll_interval"
+DEFAULT_MIN_POLL_INTERVAL = timedelta(seconds=10)
+DEFAULT_MAX_POLL_INTERVAL = timedelta(minutes=5)
+POLL_ACTIVE_WINDOW = timedelta(minutes=2)
+POLL_ERROR_BACKOFF_MAX = timedelta(minutes=15)
+POLL_MAX_CONCURRENCY = 2
+POLL_STAGGER = timedelta(seconds=1)
+# Consecutive successful polls a device must be missing from before it is removed.
+DEVICE_REMOVAL_POLLS = 3
+
+# Snapshot cache
+SNAPSHOT_SAVE_DELAY = timedelta(minutes=1)
+CONF_COMPACT_SNAPSHOT = "compact_snapshot"
+
+# Group lights
+CONF_GROUP_LIGHTS = "group_lights"
+GROUP_LIGHT_MIN_MEMBERS = 2
+
+# Commands
+COMMAND_FLUSH_INTERVAL = timedelta(milliseconds=250)
+COMMAND_MAX_CONCURRENCY = 8
+COMMAND_CONVERGENCE_TIMEOUT = timedelta(minutes=2)
+COMMAND_FAILURE_HISTORY = 20
+
+# Metrics
+METRICS_LATENCY_BUCKETS = (25.0, 50.0, 100.0, 250.0, 500.0, 1000.0, 2500.0, 5000.0, 10000.0)
+METRICS_WINDOW = 200
+ENDPOINT_DEVICE_TREE = "GET /device_groups/tree"
+ENDPOINT_DEVICE_STATE = "PUT /devices/{id}/state"
+
+# Push channel
+EVENT_STREAM_RECONCILE_INTERVAL = timedelta(minutes=10)
+EVENT_STREAM_RETRY_DELAY = (5, 300)
 
 # Device types
 LIGHT_TYPES = ("bulb", "ledstrip", "night_lamp")
 SWITCH_TYPES = ("dt_socket_sber",)
+SOCKET_METER_KEYS = ("cur_power", "cur_voltage", "cur_current")
 
 # Color temperature ranges (Kelvin) per device type
 COLOR_TEMP_RANGES: dict[str, tuple[int, int]] = {
@@ -2,55 +2,88 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
-import ssl
-from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-from authlib.common.security import generate_token
-from authlib.integrations.httpx_client import AsyncOAuth2Client
+from ..const import AUTH_ENDPOINT, COMPANION_TOKEN_URL, OAUTH_CLIENT_ID, TOKEN_ENDPOINT, TOKEN_TIMEOUT
+from .transport import DEFAULT_TIMEOUT, SberHttpTransport, get_ssl_context, operation_timeout
 
-from ..const import AUTH_ENDPOINT, COMPANION_TOKEN_URL, OAUTH_CLIENT_ID, TOKEN_ENDPOINT
+if TYPE_CHECKING:
+    import ssl
+
+    from authlib.integrations.httpx_client import AsyncOAuth2Client
 
 _LOGGER = logging.getLogger(__name__)
 
 type TokenData = dict[str, Any]
 
-_ROOT_CA_PATH = Path(__file__).parent / "russian_trusted_root_ca.pem"
-
-
-def _create_ssl_context() -> ssl.SSLContext:
-    ctx = ssl.create_default_context()
-    ctx.load_verify_locations(cafile=str(_ROOT_CA_PATH))
-    return ctx
 
+def _preload() -> None:
+    """Import authlib and build the SSL context, both of which block."""
+    import authlib.integrations.httpx_client  # noqa: F401
 
-_SSL_CONTEXT = _create_ssl_context()
-SBER_SSL_CONTEXT = _SSL_CONTEXT
+    get_ssl_context()
 
 
 class SberAuthClient:
-    """OAuth client for Sber authentication endpoints."""
-
-    def __init__(self, token: TokenData | None = None) -> None:
+    """OAuth client for Sber authentication endpoints.
+
+    Without an explicit ``transport`` the client creates and owns one; the
+    gateway client borrows it by default. The endpoint URLs can be overridden
+    to point the client at a stand-in server.
+
+    authlib is imported when the first client is built. On the event loop,
+    build clients with ``async_create``.
+    """
+
+    def __init__(
+        self,
+        token: TokenData | None = None,
+        transport: SberHttpTransport | None = None,
+        token_endpoint: str = TOKEN_ENDPOINT,
+        companion_token_url: str = COMPANION_TOKEN_URL,
+    ) -> None:
+        from authlib.common.security import generate_token
+        from authlib.integrations.httpx_client import AsyncOAuth2Client
+
+        self._token_endpoint = token_endpoint
+        self._companion_token_url = companion_token_url
+        self._owns_transport = transport is None
+        self.transport = transport or SberHttpTransport()
         self._code_verifier = generate_token(64)
-        self._oauth_client = AsyncOAuth2Client(
+        self._oauth_client: AsyncOAuth2Client = AsyncOAuth2Client(
             client_id=OAUTH_CLIENT_ID,
-            authorization_endpoint=TOKEN_ENDPOINT,
-            token_endpoint=TOKEN_ENDPOINT,
+            authorization_endpoint=token_endpoint,
+            token_endpoint=token_endpoint,
             redirect_uri="companionapp://host",
             code_challenge_method="S256",
             scope="openid",
             grant_type="authorization_code",
             token=token,
-            verify=_SSL_CONTEXT,
+            transport=self.transport.client_transport(),
+            timeout=DEFAULT_TIMEOUT,
         )
 
+    @classmethod
+    async def async_create(
+        cls,
+        token: TokenData | None = None,
+        transport: SberHttpTransport | None = None,
+        token_endpoint: str = TOKEN_ENDPOINT,
+        companion_token_url: str = COMPANION_TOKEN_URL,
+    ) -> SberAuthClient:
+        """Build a client with the blocking imports and CA loading done in the executor."""
+        await asyncio.get_running_loop().run_in_executor(None, _preload)
+        return cls(token, transport, token_endpoint, companion_token_url)
+
     @property
     def token(self) -> TokenData:
         return self._oauth_client.token
 
     def create_authorization_url(self) -> str:
+        from authlib.common.security import generate_token
+
         return self._oauth_client.create_authorization_url(
             AUTH_ENDPOINT,
             nonce=generate_token(),
@@ -60,7 +93,7 @@ class SberAuthClient:
     async def authorize_by_url(self, url: str) -> bool:
         try:
             token = await self._oauth_client.fetch_token(
-                TOKEN_ENDPOINT,
+                self._token_endpoint,
                 authorization_response=url,
                 code_verifier=self._code_verifier,
             )
@@ -72,8 +105,9 @@ class SberAuthClient:
     async def fetch_gateway_token(self) -> str:
         return (
             await self._oauth_client.get(
-                COMPANION_TOKEN_URL,
+                self._companion_token_url,
                 headers={"User-Agent": "Salute+prod%2F24.08.1.15602+%28Android+34%3B+Google+sdk_gphone64_arm64%29"},
+                timeout=operation_timeout(TOKEN_TIMEOUT),
             )
         ).json()["token"]
 
@@ -82,6 +116,20 @@ class SberAuthClient:
 
     async def async_close(self) -> None:
         await self._oauth_client.aclose()
+        if self._owns_transport:
+            await self.transport.async_close()
 
 
 SberAPI = SberAuthClient
+
+# Built on first access through __getattr__, as building it blocks.
+SBER_SSL_CONTEXT: ssl.SSLContext
+
+
+def __getattr__(name: str) -> Any:
+    if name == "SBER_SSL_CONTEXT":
+        return get_ssl_context()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = ["SBER_SSL_CONTEXT", "SberAPI", "SberAuthClient", "TokenData"]
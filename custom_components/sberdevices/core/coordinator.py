@@ -2,44 +2,320 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
+import time
+from collections.abc import Callable, Mapping
+from contextlib import nullcontext
+from datetime import timedelta
 
-from homeassistant.core import HomeAssistant
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
-from ..const import COORDINATOR_UPDATE_INTERVAL, DOMAIN
+from ..const import (
+    DEFAULT_MAX_POLL_INTERVAL,
+    DEFAULT_MIN_POLL_INTERVAL,
+    DEVICE_REMOVAL_POLLS,
+    DOMAIN,
+    EVENT_STREAM_RECONCILE_INTERVAL,
+    EVENT_STREAM_RETRY_DELAY,
+    SNAPSHOT_SAVE_DELAY,
+)
+from .descriptors import DeviceDescriptors, DeviceEntityIndex, EntityDescriptor
 from .gateway import SberHomeGatewayClient
-from .snapshot import DeviceCache, DeviceState, apply_device_state_patch
+from .metrics import CommandTracker
+from .polling import AdaptivePollSchedule, PollingEngine
+from .snapshot import (
+    DeviceCache,
+    DeviceCacheDiff,
+    DeviceRecord,
+    DeviceState,
+    DeviceStateEvent,
+    apply_device_state_event,
+    apply_device_state_patch,
+    diff_device_caches,
+    extract_devices,
+)
+from .storage import StoredSnapshot, dump_snapshot, load_snapshot, snapshot_store
 
 _LOGGER = logging.getLogger(__name__)
 
 
 class SberDataUpdateCoordinator(DataUpdateCoordinator[DeviceCache]):
-    """Coordinate polling device state from SberDevices."""
+    """Coordinate polling device state from SberDevices.
 
-    def __init__(self, hass: HomeAssistant, gateway_client: SberHomeGatewayClient) -> None:
+    With ``compact`` the snapshot keeps ``CompactDevice`` records instead of
+    the raw gateway payload.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        config_entry: ConfigEntry,
+        gateway_client: SberHomeGatewayClient,
+        min_interval: timedelta = DEFAULT_MIN_POLL_INTERVAL,
+        max_interval: timedelta = DEFAULT_MAX_POLL_INTERVAL,
+        compact: bool = False,
+        polling_engine: PollingEngine | None = None,
+    ) -> None:
+        self._schedule = AdaptivePollSchedule(min_interval, max_interval)
         super().__init__(
             hass,
             _LOGGER,
+            config_entry=config_entry,
             name=DOMAIN,
-            update_interval=COORDINATOR_UPDATE_INTERVAL,
+            update_interval=self._schedule.interval,
         )
         self.gateway_client = gateway_client
+        self.compact = compact
+        self.polling_engine = polling_engine
+        self.commands = CommandTracker()
+        self.entity_index = DeviceEntityIndex()
+        self._new_devices_listeners: list[Callable[[DeviceDescriptors], None]] = []
+        # Descriptors not announced to the platforms yet, by device id.
+        self._new_descriptors: dict[str, tuple[EntityDescriptor, ...]] = {}
+        self._registry_pruned = False
+        # Consecutive successful polls each registry device has been missing from, by registry id.
+        self._missing_polls: dict[str, int] = {}
+        # Serial numbers of devices missing from the tree whose entities still exist, by device id.
+        self._absent_devices: dict[str, str] = {}
+        self._entry_id = config_entry.entry_id
+        self._push_connected = False
+        self._store = snapshot_store(hass, self._entry_id)
+        self.last_diff = DeviceCacheDiff()
+        # Device ids to notify on the next listener update; None notifies everyone.
+        self._pending_device_ids: frozenset[str] | None = None
 
     @property
     def home_api(self) -> SberHomeGatewayClient:
         return self.gateway_client
 
     async def _async_update_data(self) -> DeviceCache:
+        """Poll the device tree and diff it against the current snapshot.
+
+        An unchanged tree keeps the current snapshot without parsing, diffing
+        or updating entities. With a shared ``polling_engine`` the poll waits
+        for a slot of the domain-wide poll budget, recorded as the
+        ``poll_wait`` stage next to ``processing`` and ``refresh``.
+        """
+        slot = self.polling_engine.poll_slot() if self.polling_engine is not None else nullcontext(0.0)
         try:
-            return await self.gateway_client.get_devices()
+            async with slot as waited:
+                self.gateway_client.metrics.record_stage("poll_wait", waited)
+                started = time.perf_counter()
+                if self.data is None:
+                    tree = await self.gateway_client.get_device_tree()
+                else:
+                    tree = await self.gateway_client.get_device_tree_if_changed()
+            processing_started = time.perf_counter()
+            # An unchanged tree keeps the current snapshot, so no entity is updated.
+            devices = self.data if tree is None else extract_devices(tree, compact=self.compact)
         except Exception as err:
+            self._pending_device_ids = None
+            self._schedule.record_failure()
+            self._apply_interval()
             raise UpdateFailed(f"Error fetching {DOMAIN} devices: {err}") from err
 
+        if self.data is None:
+            self.last_diff = DeviceCacheDiff(added=frozenset(devices))
+        elif devices is self.data:
+            self.last_diff = DeviceCacheDiff()
+        else:
+            self.last_diff = diff_device_caches(self.data, devices)
+        new_descriptors = self.entity_index.apply_diff(devices, self.last_diff)
+        if self.data is not None:
+            self._track_new_descriptors(self.data, new_descriptors)
+        # An empty tree is more likely a gateway hiccup than a home without devices.
+        if devices and (self.last_diff.removed or self._missing_polls or not self._registry_pruned):
+            self._async_prune_device_registry(devices)
+        finished = time.perf_counter()
+        self.gateway_client.metrics.record_stage("processing", finished - processing_started)
+        self.gateway_client.metrics.record_stage("refresh", finished - started)
+        self.commands.check_all(devices, time.monotonic())
+
+        if self.data is None or not self.last_update_success:
+            # Availability flips with last_update_success, so every entity must be refreshed.
+            self._pending_device_ids = None
+        else:
+            self._pending_device_ids = self.last_diff.changed | self.last_diff.added
+
+        self._schedule.record_success(self.last_diff.active)
+        self._apply_interval()
+        if self.last_diff:
+            self._async_schedule_save()
+        return devices
+
+    def _track_new_descriptors(
+        self, previous: DeviceCache, new_descriptors: dict[str, tuple[EntityDescriptor, ...]]
+    ) -> None:
+        """Queue descriptors of ``last_diff`` that need entities for the new-device listeners."""
+        for device_id in self.last_diff.removed:
+            self._absent_devices[device_id] = previous[device_id].serial_number
+        # Devices back before the registry cleanup still have their entities.
+        for device_id in self.last_diff.added & self._absent_devices.keys():
+            del self._absent_devices[device_id]
+            new_descriptors.pop(device_id, None)
+        for device_id, descriptors in new_descriptors.items():
+            self._new_descriptors[device_id] = (*self._new_descriptors.get(device_id, ()), *descriptors)
+
+    @callback
+    def _async_schedule_save(self) -> None:
+        """Save the snapshot after a debounce, so setup can start from it."""
+        self._store.async_delay_save(self._stored_snapshot, SNAPSHOT_SAVE_DELAY.total_seconds())
+
+    def _stored_snapshot(self) -> StoredSnapshot:
+        return dump_snapshot(self.data)
+
+    async def async_restore_snapshot(self) -> bool:
+        """Load the last saved snapshot into coordinator.data, if there is one."""
+        stored = await self._store.async_load()
+        if not stored or not stored.get("devices"):
+            return False
+
+        self.data = load_snapshot(stored, compact=self.compact)
+        self.entity_index.rebuild(self.data)
+        return True
+
+    def _apply_interval(self) -> None:
+        """Poll on the adaptive schedule, or at the reconciliation interval while the push channel is connected."""
+        self.update_interval = EVENT_STREAM_RECONCILE_INTERVAL if self._push_connected else self._schedule.interval
+
+    @callback
+    def async_add_new_devices_listener(self, update_callback: Callable[[DeviceDescriptors], None]) -> CALLBACK_TYPE:
+        """Call ``update_callback`` with the descriptors devices gain after setup, by device id."""
+        self._new_devices_listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._new_devices_listeners.remove(update_callback)
+
+        return remove_listener
+
+    @callback
+    def _async_prune_device_registry(self, devices: Mapping[str, DeviceRecord]) -> None:
+        """Detach registry devices of this entry that the gateway no longer returns.
+
+        A device is detached only after ``DEVICE_REMOVAL_POLLS`` consecutive
+        successful polls without it, so a partial tree from a gateway hiccup
+        does not drop entities along with their registry customisations.
+        """
+        self._registry_pruned = True
+        known = {device.serial_number for device in devices.values()}
+        known.add(self._entry_id)
+        registry = dr.async_get(self.hass)
+        missing_polls: dict[str, int] = {}
+        for device_entry in dr.async_entries_for_config_entry(registry, self._entry_id):
+            if any(domain == DOMAIN and identifier in known for domain, identifier in device_entry.identifiers):
+                continue
+            polls = self._missing_polls.get(device_entry.id, 0) + 1
+            if polls < DEVICE_REMOVAL_POLLS:
+                missing_polls[device_entry.id] = polls
+                continue
+            _LOGGER.debug("Removing device %s that the gateway no longer returns", device_entry.name)
+            registry.async_update_device(device_entry.id, remove_config_entry_id=self._entry_id)
+            serials = {identifier for domain, identifier in device_entry.identifiers if domain == DOMAIN}
+            self._absent_devices = {
+                device_id: serial for device_id, serial in self._absent_devices.items() if serial not in serials
+            }
+        self._missing_polls = missing_polls
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Notify listeners of changed devices and listeners without a device context.
+
+        Entities register with their device id as listener context, so only
+        the entities of devices that changed since the previous snapshot wake.
+        """
+        if self._new_descriptors:
+            new_descriptors, self._new_descriptors = self._new_descriptors, {}
+            for update_callback in list(self._new_devices_listeners):
+                update_callback(new_descriptors)
+
+        device_ids, self._pending_device_ids = self._pending_device_ids, None
+        if device_ids is None:
+            super().async_update_listeners()
+            return
+
+        for update_callback, context in list(self._listeners.values()):
+            if context is None or context in device_ids:
+                update_callback()
+
     def async_patch_device_state(self, device_id: str, state: list[DeviceState]) -> None:
-        """Publish an optimistic update into coordinator.data."""
-        apply_device_state_patch(self.data[device_id], state)
+        """Publish an optimistic update into coordinator.data and start tracking the command."""
+        self.async_patch_devices_state({device_id: state})
+
+    def async_patch_devices_state(self, states: Mapping[str, list[DeviceState]]) -> None:
+        """Publish optimistic updates of several devices with a single listener update."""
+        now = time.monotonic()
+        for device_id, state in states.items():
+            apply_device_state_patch(self.data[device_id], state)
+            self.commands.record_command(device_id, state, now)
+        self.gateway_client.forget_device_tree()
+        self._async_schedule_save()
+        if self.last_update_success:
+            self._pending_device_ids = frozenset(states)
+        self._schedule.mark_active()
+        self._apply_interval()
         self.async_set_updated_data(self.data)
 
+    async def async_set_devices_state(self, states: Mapping[str, list[DeviceState]]) -> None:
+        """Patch several devices optimistically and write them as one batch."""
+        self.async_patch_devices_state(states)
+        try:
+            await self.gateway_client.set_devices_state(states)
+        except Exception:
+            for device_id, state in states.items():
+                self.commands.cancel(device_id, state)
+            await self.async_request_refresh()
+            raise
+
+    @callback
+    def async_apply_device_event(self, event: DeviceStateEvent) -> None:
+        """Merge a pushed state event into coordinator.data."""
+        if self.data is None:
+            return
+
+        device_id = event["device_id"]
+        if device_id not in self.data:
+            # Unknown device: let the full tree poll pick it up.
+            self.hass.async_create_task(self.async_request_refresh())
+            return
+
+        if apply_device_state_event(self.data, event):
+            self._async_schedule_save()
+            self.gateway_client.forget_device_tree()
+            if "reported_state" in event:
+                self.commands.check(device_id, self.data[device_id], time.monotonic())
+            if self.last_update_success:
+                self._pending_device_ids = frozenset((device_id,))
+                self.async_update_listeners()
+
+    async def async_run_event_stream(self) -> None:
+        """Consume the gateway push channel, reconnecting with backoff until cancelled."""
+        min_delay, max_delay = EVENT_STREAM_RETRY_DELAY
+        retry_delay = min_delay
+        while True:
+            try:
+                async for event in self.gateway_client.stream_device_events():
+                    if not self._push_connected:
+                        _LOGGER.debug("Push channel connected, polling every %s", EVENT_STREAM_RECONCILE_INTERVAL)
+                        self._push_connected = True
+                        self._apply_interval()
+                        retry_delay = min_delay
+                    self.async_apply_device_event(event)
+            except asyncio.CancelledError:
+                raise
+            except Exception as err:
+                _LOGGER.debug("Push channel failed: %s", err)
+
+            # Events may have been missed while disconnected, so reconcile right away.
+            self._push_connected = False
+            self._apply_interval()
+            await self.async_request_refresh()
+            await asyncio.sleep(retry_delay)
+            retry_delay = min(retry_delay * 2, max_delay)
+
 
 SberDevicesDataUpdateCoordinator = SberDataUpdateCoordinator
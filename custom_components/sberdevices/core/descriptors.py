@@ -0,0 +1,213 @@
+"""Classification of devices into the entities each platform creates."""
+
+from __future__ import annotations
+
+import logging
+from collections import Counter
+from collections.abc import Iterator, Mapping
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any
+
+from homeassistant.const import Platform
+
+from ..const import LIGHT_TYPES, SOCKET_METER_KEYS, SWITCH_TYPES
+from .snapshot import DeviceCacheDiff, DeviceRecord
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class EntityDescriptor:
+    """One entity of a device: the platform creates it from ``key`` and ``variant``."""
+
+    platform: Platform
+    key: str
+    variant: str = ""
+
+
+# Entity descriptors by device id.
+type DeviceDescriptors = Mapping[str, tuple[EntityDescriptor, ...]]
+
+
+@dataclass(frozen=True, slots=True)
+class DeviceRule:
+    """Create ``descriptor`` for every device that matches the rule.
+
+    ``image_set_types`` are matched as substrings of the device's
+    ``image_set_type``; an empty tuple matches any device. The device must
+    also report every key in ``reported_states`` and have every key in
+    ``attributes``. A device gets at most one entity per platform and key,
+    from the first matching rule.
+    """
+
+    descriptor: EntityDescriptor
+    image_set_types: tuple[str, ...] = ()
+    reported_states: tuple[str, ...] = ()
+    attributes: tuple[str, ...] = ()
+
+    def matches_type(self, image_set_type: str) -> bool:
+        return not self.image_set_types or any(t in image_set_type for t in self.image_set_types)
+
+    def matches(self, device: DeviceRecord) -> bool:
+        return (
+            self.matches_type(device.image_set_type)
+            and all(key in device.reported_state for key in self.reported_states)
+            and all(key in device.attributes for key in self.attributes)
+        )
+
+
+DEVICE_RULES: tuple[DeviceRule, ...] = (
+    *(
+        DeviceRule(EntityDescriptor(Platform.LIGHT, "light", light_type), image_set_types=(light_type,))
+        for light_type in LIGHT_TYPES
+    ),
+    DeviceRule(EntityDescriptor(Platform.SWITCH, "switch"), image_set_types=SWITCH_TYPES),
+    *(
+        DeviceRule(EntityDescriptor(Platform.SENSOR, key), image_set_types=SWITCH_TYPES, reported_states=(key,))
+        for key in SOCKET_METER_KEYS
+    ),
+    DeviceRule(
+        EntityDescriptor(Platform.SENSOR, "energy"), image_set_types=SWITCH_TYPES, reported_states=("cur_power",)
+    ),
+)
+
+
+def classify_device(device: DeviceRecord, rules: tuple[DeviceRule, ...] = DEVICE_RULES) -> tuple[EntityDescriptor, ...]:
+    """Return the entity descriptors of ``device``, in rule order."""
+    descriptors: dict[tuple[Platform, str], EntityDescriptor] = {}
+    for rule in rules:
+        slot = (rule.descriptor.platform, rule.descriptor.key)
+        if slot not in descriptors and rule.matches(device):
+            descriptors[slot] = rule.descriptor
+    return tuple(descriptors.values())
+
+
+def platform_descriptors(descriptors: DeviceDescriptors, platform: Platform) -> Iterator[tuple[str, EntityDescriptor]]:
+    """Yield ``(device_id, descriptor)`` for the descriptors of ``platform``."""
+    for device_id, device_descriptors in descriptors.items():
+        for descriptor in device_descriptors:
+            if descriptor.platform is platform:
+                yield device_id, descriptor
+
+
+def _classify_state(device: DeviceRecord, rules: tuple[DeviceRule, ...]) -> tuple[EntityDescriptor, ...]:
+    """Like ``classify_device`` for ``rules`` already matched against the device's type."""
+    descriptors: dict[tuple[Platform, str], EntityDescriptor] = {}
+    reported_state = device.reported_state
+    attributes = device.attributes
+    for rule in rules:
+        slot = (rule.descriptor.platform, rule.descriptor.key)
+        if (
+            slot not in descriptors
+            and all(key in reported_state for key in rule.reported_states)
+            and all(key in attributes for key in rule.attributes)
+        ):
+            descriptors[slot] = rule.descriptor
+    return tuple(descriptors.values())
+
+
+class DeviceEntityIndex:
+    """Entity descriptors of every device, by device and by platform.
+
+    Each device is classified when it is added; platforms look up their
+    devices with ``platform`` instead of scanning the snapshot. A changed
+    device is classified again and only ever gains descriptors. Devices no
+    rule matches are kept in ``unsupported``. The rules matching each
+    ``image_set_type`` are worked out once per type.
+    """
+
+    def __init__(self, rules: tuple[DeviceRule, ...] = DEVICE_RULES) -> None:
+        self._rules = rules
+        self._type_rules: dict[str, tuple[DeviceRule, ...]] = {}
+        self.devices: dict[str, tuple[EntityDescriptor, ...]] = {}
+        self._platforms: dict[Platform, dict[str, tuple[EntityDescriptor, ...]]] = {}
+        self.unsupported: dict[str, str] = {}
+
+    def add(self, device: DeviceRecord) -> tuple[EntityDescriptor, ...]:
+        device_id = device.id
+        if device_id in self.devices:
+            self.remove(device_id)
+
+        descriptors = self._classify(device)
+        self.devices[device_id] = descriptors
+        if not descriptors:
+            _LOGGER.debug("No entities for device %s of type %s", device_id, device.image_set_type)
+            self.unsupported[device_id] = device.image_set_type
+        self._add_to_platforms(device_id, descriptors)
+        return descriptors
+
+    def extend(self, device: DeviceRecord) -> tuple[EntityDescriptor, ...]:
+        """Add the descriptors ``device`` newly matches, keeping its others; return the new ones."""
+        existing = self.devices.get(device.id)
+        if existing is None:
+            return self.add(device)
+
+        new = tuple(descriptor for descriptor in self._classify(device) if descriptor not in existing)
+        if new:
+            self.devices[device.id] = (*existing, *new)
+            self.unsupported.pop(device.id, None)
+            self._add_to_platforms(device.id, new)
+        return new
+
+    def _classify(self, device: DeviceRecord) -> tuple[EntityDescriptor, ...]:
+        image_set_type = device.image_set_type
+        rules = self._type_rules.get(image_set_type)
+        if rules is None:
+            rules = self._type_rules[image_set_type] = tuple(
+                rule for rule in self._rules if rule.matches_type(image_set_type)
+            )
+        return _classify_state(device, rules) if rules else ()
+
+    def _add_to_platforms(self, device_id: str, descriptors: tuple[EntityDescriptor, ...]) -> None:
+        for descriptor in descriptors:
+            platform = self._platforms.get(descriptor.platform)
+            if platform is None:
+                platform = self._platforms[descriptor.platform] = {}
+            platform[device_id] = (*platform.get(device_id, ()), descriptor)
+
+    def remove(self, device_id: str) -> None:
+        self.unsupported.pop(device_id, None)
+        for descriptor in self.devices.pop(device_id, ()):
+            self._platforms[descriptor.platform].pop(device_id, None)
+
+    def rebuild(self, devices: Mapping[str, DeviceRecord]) -> None:
+        self.devices.clear()
+        self.unsupported.clear()
+        for platform in self._platforms.values():
+            platform.clear()
+        for device in devices.values():
+            self.add(device)
+
+    def apply_diff(
+        self, devices: Mapping[str, DeviceRecord], diff: DeviceCacheDiff
+    ) -> dict[str, tuple[EntityDescriptor, ...]]:
+        """Classify added and changed devices, drop removed ones and return the new descriptors.
+
+        Changed devices keep the descriptors they stop matching, so their
+        entities are not created twice should they match again.
+        """
+        for device_id in diff.removed:
+            self.remove(device_id)
+        new: dict[str, tuple[EntityDescriptor, ...]] = {}
+        for device_id in diff.added:
+            if descriptors := self.add(devices[device_id]):
+                new[device_id] = descriptors
+        for device_id in diff.changed:
+            if descriptors := self.extend(devices[device_id]):
+                new[device_id] = descriptors
+        return new
+
+    def platform(self, platform: Platform) -> DeviceDescriptors:
+        """Return a live view of the descriptors of ``platform`` by device id."""
+        return MappingProxyType(self._platforms.setdefault(platform, {}))
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "platforms": {
+                str(platform): sum(len(descriptors) for descriptors in devices.values())
+                for platform, devices in self._platforms.items()
+                if devices
+            },
+            "unsupported": dict(Counter(self.unsupported.values())),
+        }
@@ -2,78 +2,90 @@
 
 from __future__ import annotations
 
+from typing import Any
+
 from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from ..const import DOMAIN
 from .coordinator import SberDataUpdateCoordinator
-from .snapshot import DeviceAttribute, DeviceData, DeviceState, find_by_key
+from .snapshot import DeviceAttribute, DeviceRecord, DeviceState
 
 
 class SberEntity(CoordinatorEntity[SberDataUpdateCoordinator]):
     """Base class for SberDevices entities."""
 
     def __init__(self, coordinator: SberDataUpdateCoordinator, device_id: str) -> None:
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=device_id)
         self._device_id = device_id
 
         device = self.device
-        self._attr_unique_id = device["id"]
-        self._attr_name = device["name"]["name"]
+        self._attr_unique_id = device.id
+        if not self.has_entity_name:
+            self._attr_name = device.name
         self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, device["serial_number"])},
-            name=device["name"]["name"],
-            manufacturer=device["device_info"]["manufacturer"],
-            model=device["device_info"]["model"],
-            sw_version=device["sw_version"],
-            serial_number=device["serial_number"],
+            identifiers={(DOMAIN, device.serial_number)},
+            name=device.name,
+            manufacturer=device.manufacturer,
+            model=device.model,
+            sw_version=device.sw_version,
+            serial_number=device.serial_number,
         )
+        # The outermost group is the home itself; the innermost one below it is the room.
+        if len(group_path := coordinator.data.group_path(device_id)) > 1:
+            self._attr_device_info["suggested_area"] = group_path[-1]
 
     @property
-    def device(self) -> DeviceData:
+    def device(self) -> DeviceRecord:
         return self.coordinator.data[self._device_id]
 
-    def get_desired_state(self, key: str) -> DeviceState:
-        state = find_by_key(self.device["desired_state"], key)
-        if state is None:
-            raise KeyError(key)
-        return state
+    # Decoded values are typed by their state key, so callers get them as Any like raw payload fields.
+    def get_desired_value(self, key: str) -> Any:
+        return self.device.desired_value(key)
 
-    def get_state(self, key: str) -> DeviceState:
-        return self.get_desired_state(key)
+    def get_value(self, key: str) -> Any:
+        return self.get_desired_value(key)
 
-    def get_reported_state(self, key: str) -> DeviceState | None:
-        if "reported_state" not in self.device:
+    def get_reported_value(self, key: str) -> Any:
+        return self.device.reported_value(key)
+
+    def get_reported_number(self, key: str) -> int | float | None:
+        value = self.get_reported_value(key)
+        if isinstance(value, bool) or not isinstance(value, int | float):
             return None
-        return find_by_key(self.device["reported_state"], key)
+        return value
 
     @property
     def available(self) -> bool:
-        if not super().available:
+        # A removed device stays in HA until the registry cleanup removes its entities.
+        if not super().available or self._device_id not in self.coordinator.data:
             return False
 
-        online_state = self.get_reported_state("online")
-        if online_state is None:
-            return True
-
-        online_value = online_state.get("bool_value")
+        online_value = self.get_reported_value("online")
         if isinstance(online_value, bool):
             return online_value
 
         return True
 
     def has_attribute(self, key: str) -> bool:
-        return find_by_key(self.device["attributes"], key) is not None
+        return key in self.device.attributes
 
     def get_attribute(self, key: str) -> DeviceAttribute:
-        attribute = find_by_key(self.device["attributes"], key)
+        attribute = self.device.attributes.get(key)
         if attribute is None:
             raise KeyError(key)
         return attribute
 
     async def async_set_states(self, states: list[DeviceState]) -> None:
-        await self.coordinator.gateway_client.set_device_state(self._device_id, states)
+        # Publish optimistically before the write: rapid commands are coalesced by the
+        # gateway client and may wait for an earlier write to the same device.
         self.coordinator.async_patch_device_state(self._device_id, states)
+        try:
+            await self.coordinator.gateway_client.set_device_state(self._device_id, states)
+        except Exception:
+            self.coordinator.commands.cancel(self._device_id, states)
+            await self.coordinator.async_request_refresh()
+            raise
 
     async def async_set_on_off(self, state: bool) -> None:
         await self.async_set_states([{"key": "on_off", "bool_value": state}])
@@ -82,5 +94,6 @@ class SberEntity(CoordinatorEntity[SberDataUpdateCoordinator]):
         raise NotImplementedError
 
     def _handle_coordinator_update(self) -> None:
-        self._update_attrs()
+        if self._device_id in self.coordinator.data:
+            self._update_attrs()
         super()._handle_coordinator_update()
@@ -2,83 +2,594 @@
 
 from __future__ import annotations
 
+import asyncio
+import base64
+import binascii
+import hashlib
+import logging
+import random
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable, Mapping
+from dataclasses import dataclass
 from datetime import UTC, datetime
+from enum import StrEnum
 from typing import Any
 
-from httpx import AsyncClient
+import orjson
+from httpx import URL, AsyncClient, Response, Timeout, TransportError
 
-from ..const import GATEWAY_BASE_URL
-from .auth import SBER_SSL_CONTEXT, SberAuthClient
-from .snapshot import DeviceCache, DeviceState, DeviceTreeNode, extract_devices
+from ..const import (
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_HALF_OPEN_PROBES,
+    CIRCUIT_RESET_TIMEOUT,
+    COMMAND_FLUSH_INTERVAL,
+    COMMAND_MAX_CONCURRENCY,
+    DEVICE_TREE_DEADLINE,
+    DEVICE_TREE_TIMEOUT,
+    ENDPOINT_DEVICE_TREE,
+    GATEWAY_BASE_URL,
+    GATEWAY_TOKEN_REFRESH_MARGIN,
+    GATEWAY_TOKEN_REFRESH_MIN_DELAY,
+    HTTP_CONNECT_TIMEOUT,
+    REQUEST_RETRY_ATTEMPTS,
+    REQUEST_RETRY_DELAY,
+    STATE_WRITE_DEADLINE,
+    STATE_WRITE_TIMEOUT,
+)
+from .auth import SberAuthClient
+from .metrics import PerformanceMetrics, endpoint_name
+from .snapshot import (
+    DeviceCache,
+    DeviceState,
+    DeviceStateEvent,
+    DeviceTreeNode,
+    extract_devices,
+    merge_state_patches,
+)
+from .transport import DEFAULT_TIMEOUT, SberHttpTransport, operation_timeout
+
+_LOGGER = logging.getLogger(__name__)
 
 type GatewayPayload = dict[str, Any]
 
+_OK = 200
+_NOT_MODIFIED = 304
+
+
+def json_loads(content: bytes | str) -> Any:
+    """Decode a response body with orjson, which ships with Home Assistant.
+
+    orjson parses large device trees about 2.5 times faster than the stdlib
+    decoder, at the cost of a higher transient peak while parsing.
+    """
+    return orjson.loads(content)
+
+
+def _jwt_expiry(token: str) -> float | None:
+    """Return the ``exp`` claim of a JWT as a Unix timestamp, if it has one."""
+    try:
+        payload = token.split(".")[1]
+        claims = json_loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+    except (IndexError, ValueError, binascii.Error):
+        return None
+
+    exp = claims.get("exp") if isinstance(claims, dict) else None
+    return float(exp) if isinstance(exp, int | float) else None
+
+
+def _digest(content: bytes) -> bytes:
+    """Fingerprint a response body; SHA-1 is the fastest hashlib digest with hardware support."""
+    return hashlib.sha1(content, usedforsecurity=False).digest()
+
 
 def _decode_device_tree_response(payload: GatewayPayload) -> DeviceTreeNode:
     """Extract the typed device tree from the raw gateway payload."""
     return payload["result"]
 
 
+def _decode_device_event(payload: GatewayPayload) -> DeviceStateEvent | None:
+    """Extract a device state event from a push channel message, skipping keep-alives."""
+    device_id = payload.get("device_id")
+    if not isinstance(device_id, str):
+        return None
+
+    event: DeviceStateEvent = {"device_id": device_id}
+    for field in ("desired_state", "reported_state"):
+        states = payload.get(field)
+        if isinstance(states, list):
+            event[field] = states
+    return event
+
+
+class GatewayError(Exception):
+    """Error response from the gateway."""
+
+    def __init__(self, status_code: int, code: Any, message: str) -> None:
+        super().__init__(f"{code} ({status_code}): {message}")
+        self.status_code = status_code
+        self.code = code
+
+
+class CircuitOpenError(Exception):
+    """Request rejected without contacting the gateway because the circuit is open."""
+
+
+def _is_transient(err: BaseException) -> bool:
+    """Return whether ``err`` points at a degraded gateway rather than a bad request."""
+    return isinstance(err, TransportError) or (isinstance(err, GatewayError) and err.status_code >= 500)
+
+
+class CircuitState(StrEnum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Fail fast while the gateway keeps failing.
+
+    ``failure_threshold`` consecutive transient failures (transport errors,
+    timeouts, 5xx responses) open the circuit. While open, requests are
+    rejected with ``CircuitOpenError``. After ``reset_timeout`` seconds up to
+    ``half_open_probes`` requests are let through; a successful probe closes
+    the circuit and a failed one opens it again.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout: float = CIRCUIT_RESET_TIMEOUT.total_seconds(),
+        half_open_probes: int = CIRCUIT_HALF_OPEN_PROBES,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._half_open_probes = half_open_probes
+        self._clock = clock
+        self.state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self.trips = 0
+        self.rejected = 0
+        self._opened_at = 0.0
+        self._probes = 0
+
+    def before_request(self) -> None:
+        """Admit a request or raise ``CircuitOpenError``."""
+        if self.state is CircuitState.OPEN:
+            retry_after = self._opened_at + self._reset_timeout - self._clock()
+            if retry_after > 0:
+                self.rejected += 1
+                raise CircuitOpenError(f"Gateway circuit is open, retrying in {retry_after:.0f} s")
+            self.state = CircuitState.HALF_OPEN
+            self._probes = 0
+
+        if self.state is CircuitState.HALF_OPEN:
+            if self._probes >= self._half_open_probes:
+                self.rejected += 1
+                raise CircuitOpenError("Gateway circuit is half-open, waiting for a probe")
+            self._probes += 1
+
+    def release_probe(self) -> None:
+        """Give back the probe of an admitted request that never reached the gateway."""
+        if self.state is CircuitState.HALF_OPEN and self._probes > 0:
+            self._probes -= 1
+
+    def record_success(self) -> None:
+        self.consecutive_failures = 0
+        if self.state is not CircuitState.CLOSED:
+            _LOGGER.debug("Gateway recovered, closing circuit")
+            self.state = CircuitState.CLOSED
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        if self.state is CircuitState.HALF_OPEN or (
+            self.state is CircuitState.CLOSED and self.consecutive_failures >= self._failure_threshold
+        ):
+            _LOGGER.debug("Opening gateway circuit after %s failures", self.consecutive_failures)
+            self.state = CircuitState.OPEN
+            self._opened_at = self._clock()
+            self.trips += 1
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "state": self.state.value,
+            "consecutive_failures": self.consecutive_failures,
+            "trips": self.trips,
+            "rejected": self.rejected,
+        }
+
+
+@dataclass(slots=True, frozen=True)
+class RetryPolicy:
+    """Bounded retry with full-jitter exponential backoff for idempotent requests."""
+
+    attempts: int = REQUEST_RETRY_ATTEMPTS
+    base_delay: float = REQUEST_RETRY_DELAY[0]
+    max_delay: float = REQUEST_RETRY_DELAY[1]
+
+    def delay(self, attempt: int) -> float:
+        """Return the pause before retry number ``attempt``, counting from 1."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+class _PendingWrite:
+    __slots__ = ("future", "states")
+
+    def __init__(self, states: list[DeviceState], future: asyncio.Future[None]) -> None:
+        self.states = states
+        self.future = future
+
+
+class DeviceStateWriteQueue:
+    """Coalesce state writes per device and flush them at a bounded rate.
+
+    A write to an idle device is sent right away. Writes that arrive while a
+    device's previous write is in flight or inside its flush interval are
+    merged last-write-wins and sent together, so every caller of the merged
+    batch resolves with the same result and writes never overtake each other.
+
+    Each device flushes from its own worker task, so writes to many devices
+    issued in the same event-loop tick (a scene or an area service call) go
+    out together, at most ``max_concurrency`` at a time, and each caller
+    resolves with its own device's result.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[str, list[DeviceState]], Awaitable[None]],
+        flush_interval: float = COMMAND_FLUSH_INTERVAL.total_seconds(),
+        max_concurrency: int = COMMAND_MAX_CONCURRENCY,
+    ) -> None:
+        self._send = send
+        self._flush_interval = flush_interval
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._pending: dict[str, _PendingWrite] = {}
+        self._next_flush: dict[str, float] = {}
+        self._workers: dict[str, asyncio.Task[None]] = {}
+
+    async def write(self, device_id: str, states: list[DeviceState]) -> None:
+        loop = asyncio.get_running_loop()
+        pending = self._pending.get(device_id)
+        if pending is None:
+            pending = self._pending[device_id] = _PendingWrite(states, loop.create_future())
+        else:
+            pending.states = merge_state_patches(pending.states, states)
+
+        if device_id not in self._workers:
+            self._workers[device_id] = loop.create_task(self._flush_device(device_id))
+        await asyncio.shield(pending.future)
+
+    async def _flush_device(self, device_id: str) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            while device_id in self._pending:
+                delay = self._next_flush.get(device_id, 0.0) - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+                pending = self._pending.pop(device_id)
+                self._next_flush[device_id] = loop.time() + self._flush_interval
+                try:
+                    async with self._semaphore:
+                        await self._send(device_id, pending.states)
+                except Exception as err:
+                    if not pending.future.done():
+                        pending.future.set_exception(err)
+                else:
+                    if not pending.future.done():
+                        pending.future.set_result(None)
+                finally:
+                    # A worker cancelled mid-send by async_close must not leave the batch's callers waiting.
+                    if not pending.future.done():
+                        pending.future.cancel()
+        finally:
+            del self._workers[device_id]
+
+    async def async_close(self) -> None:
+        for worker in self._workers.values():
+            worker.cancel()
+        for pending in self._pending.values():
+            pending.future.cancel()
+        self._pending.clear()
+
+
 class SberHomeGatewayClient:
-    """Gateway client for Sber smart-home APIs."""
+    """Gateway client for Sber smart-home APIs.
+
+    Requests share the auth client's connection pool unless another
+    ``transport`` is given, and record per-endpoint ``metrics``.
+    """
 
-    def __init__(self, auth_client: SberAuthClient) -> None:
+    def __init__(
+        self,
+        auth_client: SberAuthClient,
+        base_url: str = GATEWAY_BASE_URL,
+        events_url: str | None = None,
+        transport: SberHttpTransport | None = None,
+        metrics: PerformanceMetrics | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        retry_policy: RetryPolicy | None = None,
+    ) -> None:
+        if events_url is not None and (URL(events_url).scheme or URL(events_url).host):
+            # The gateway token must never be sent to a host other than the gateway.
+            raise ValueError("events_url must be a path on the gateway")
         self._auth_client = auth_client
-        self._client = AsyncClient(base_url=GATEWAY_BASE_URL, verify=SBER_SSL_CONTEXT)
-        self._has_gateway_token = False
+        self.metrics = metrics or PerformanceMetrics()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self._retry_policy = retry_policy or RetryPolicy()
+        self._client = AsyncClient(
+            base_url=base_url,
+            transport=(transport or auth_client.transport).client_transport(),
+            timeout=DEFAULT_TIMEOUT,
+        )
+        self._events_url = events_url
+        self._gateway_token: str | None = None
+        self._gateway_token_expires_at: float | None = None
+        self._token_lock = asyncio.Lock()
+        self._token_refresh_timer: asyncio.TimerHandle | None = None
+        self._token_refresh_task: asyncio.Task[None] | None = None
+        self._write_queue = DeviceStateWriteQueue(self._put_device_state)
+        self._tree_etag: str | None = None
+        self._tree_digest: bytes | None = None
+        self._tree_generation = 0
+
+    @property
+    def supports_push(self) -> bool:
+        return self._events_url is not None
 
     async def async_close(self) -> None:
+        if self._token_refresh_timer is not None:
+            self._token_refresh_timer.cancel()
+        if self._token_refresh_task is not None:
+            self._token_refresh_task.cancel()
+        await self._write_queue.async_close()
         await self._client.aclose()
 
-    async def _ensure_gateway_token(self) -> None:
-        if self._has_gateway_token:
+    def _gateway_token_is_fresh(self) -> bool:
+        if self._gateway_token is None:
+            return False
+        if self._gateway_token_expires_at is None:
+            return True
+        return time.time() < self._gateway_token_expires_at
+
+    async def _ensure_gateway_token(self, force: bool = False) -> str | None:
+        """Return the gateway token, fetching it once for all concurrent callers.
+
+        A token with an ``exp`` claim is refreshed in the background ahead of expiry.
+        """
+        if not force and self._gateway_token_is_fresh():
+            return self._gateway_token
+
+        stale_token = self._gateway_token
+        async with self._token_lock:
+            # Another caller may have refreshed the token while we waited for the lock.
+            if self._gateway_token != stale_token or (not force and self._gateway_token_is_fresh()):
+                return self._gateway_token
+
+            token = await self._auth_client.fetch_gateway_token()
+            if token is not None:
+                previous_expiry = self._gateway_token_expires_at
+                self._client.headers.update({"X-AUTH-jwt": token})
+                self._gateway_token = token
+                self._gateway_token_expires_at = expiry = _jwt_expiry(token)
+                # A token that does not outlive the previous one would only schedule the same refresh again.
+                if expiry is not None and (previous_expiry is None or expiry > previous_expiry):
+                    self._schedule_token_refresh()
+            return self._gateway_token
+
+    def _invalidate_gateway_token(self, token: str | None) -> None:
+        """Drop ``token`` unless it was already replaced by a newer one."""
+        if token is not None and self._gateway_token == token:
+            self._gateway_token = None
+
+    def _schedule_token_refresh(self) -> None:
+        if self._token_refresh_timer is not None:
+            self._token_refresh_timer.cancel()
+            self._token_refresh_timer = None
+        if self._gateway_token_expires_at is None:
             return
 
-        token = await self._auth_client.fetch_gateway_token()
-        if token is not None:
-            self._client.headers.update({"X-AUTH-jwt": token})
-            self._has_gateway_token = True
+        delay = self._gateway_token_expires_at - GATEWAY_TOKEN_REFRESH_MARGIN.total_seconds() - time.time()
+        # Tokens living shorter than the margin are refreshed on demand in between.
+        delay = max(delay, GATEWAY_TOKEN_REFRESH_MIN_DELAY.total_seconds())
+        loop = asyncio.get_running_loop()
+        self._token_refresh_timer = loop.call_later(delay, self._start_token_refresh)
+
+    def _start_token_refresh(self) -> None:
+        self._token_refresh_timer = None
+        self._token_refresh_task = asyncio.get_running_loop().create_task(self._refresh_gateway_token())
+
+    async def _refresh_gateway_token(self) -> None:
+        try:
+            await self._ensure_gateway_token(force=True)
+        except Exception as err:
+            # Requests fall back to refreshing on demand once the token expires.
+            _LOGGER.debug("Proactive gateway token refresh failed: %s", err)
+        finally:
+            self._token_refresh_task = None
 
     async def update_token(self) -> None:
         await self._ensure_gateway_token()
 
     async def _request(self, method: str, url: str, retry: bool = True, **kwargs: Any) -> GatewayPayload:
-        await self._ensure_gateway_token()
+        return json_loads((await self._send(method, url, retry, **kwargs)).content)
+
+    async def _send(self, method: str, url: str, retry: bool = True, **kwargs: Any) -> Response:
+        """Send a request and return its 200 or 304 response, raising ``GatewayError`` for the rest.
+
+        Requests pass the ``circuit_breaker``, so they fail fast while the
+        gateway is down. GETs are retried on transient failures with the retry
+        policy; state writes are not retried.
+        """
+        endpoint = endpoint_name(method, url)
+        attempts = self._retry_policy.attempts if method == "GET" else 1
+        attempt = 1
+        while True:
+            try:
+                return await self._send_once(method, url, endpoint, retry, **kwargs)
+            except Exception as err:
+                if attempt >= attempts or not _is_transient(err):
+                    raise
+                delay = self._retry_policy.delay(attempt)
+                _LOGGER.debug("%s failed (%s), retrying in %.1f s", endpoint, err, delay)
+                self.metrics.record_retry(endpoint)
+                await asyncio.sleep(delay)
+                attempt += 1
+
+    async def _send_once(self, method: str, url: str, endpoint: str, retry: bool = True, **kwargs: Any) -> Response:
+        # Checked first, so an open circuit does not fetch companion tokens either.
+        self.circuit_breaker.before_request()
+        try:
+            token = await self._ensure_gateway_token()
+        except BaseException:
+            self.circuit_breaker.release_probe()
+            raise
+
+        started = time.perf_counter()
+        try:
+            res = await self._client.request(method, url, **kwargs)
+        except BaseException as err:
+            # Cancellation by a deadline counts too, so a half-open probe is never left hanging.
+            self.circuit_breaker.record_failure()
+            if isinstance(err, Exception):
+                self.metrics.record_request(endpoint, time.perf_counter() - started, error=type(err).__name__)
+            raise
+        if res.status_code >= 500:
+            self.circuit_breaker.record_failure()
+        else:
+            self.circuit_breaker.record_success()
+        self.metrics.record_request(
+            endpoint,
+            time.perf_counter() - started,
+            request_bytes=len(res.request.content),
+            response_bytes=len(res.content),
+            error=None if res.status_code in (_OK, _NOT_MODIFIED) else f"http {res.status_code}",
+        )
+        if res.status_code in (_OK, _NOT_MODIFIED):
+            return res
+
+        try:
+            payload = json_loads(res.content)
+        except ValueError:
+            # Proxies in front of the gateway answer outages with HTML pages.
+            payload = {"code": None, "message": res.reason_phrase}
+        if payload["code"] == 16:
+            self._invalidate_gateway_token(token)
+            if retry:
+                self.metrics.record_retry(endpoint)
+                return await self._send_once(method, url, endpoint, retry=False, **kwargs)
 
-        res = await self._client.request(method, url, **kwargs)
-        payload = res.json()
-        if res.status_code != 200:
-            code = payload["code"]
-            if code == 16:
-                self._has_gateway_token = False
-                if retry:
-                    return await self._request(method, url, retry=False, **kwargs)
+        raise self._error(res, payload)
 
-            raise Exception(f"{code} ({res.status_code}): {payload['message']}")
-        return payload
+    def _error(self, res: Response, payload: GatewayPayload) -> GatewayError:
+        return GatewayError(res.status_code, payload["code"], payload["message"])
 
     async def request(self, method: str, url: str, retry: bool = True, **kwargs: Any) -> GatewayPayload:
         return await self._request(method, url, retry=retry, **kwargs)
 
     async def get_device_tree(self) -> DeviceTreeNode:
-        return _decode_device_tree_response(await self._request("GET", "/device_groups/tree"))
+        res = await self._get_device_tree_response({})
+        return self._remember_device_tree(res, _digest(res.content))
+
+    async def get_device_tree_if_changed(self) -> DeviceTreeNode | None:
+        """Fetch the device tree, or return None when it is unchanged since the previous fetch.
+
+        Revalidates with ``If-None-Match`` when the gateway sent an ``ETag``
+        and otherwise compares a digest of the raw body.
+        """
+        generation = self._tree_generation
+        headers = {"If-None-Match": self._tree_etag} if self._tree_etag is not None else {}
+        res = await self._get_device_tree_response(headers)
+
+        digest = _digest(res.content)
+        # A patch applied while the request was in flight invalidates the comparison.
+        if generation == self._tree_generation and (res.status_code == _NOT_MODIFIED or digest == self._tree_digest):
+            self.metrics.endpoint(ENDPOINT_DEVICE_TREE).unchanged += 1
+            return None
+        if res.status_code == _NOT_MODIFIED:
+            return await self.get_device_tree()
+        return self._remember_device_tree(res, digest)
 
-    async def get_devices(self) -> DeviceCache:
-        return extract_devices(await self.get_device_tree())
+    def forget_device_tree(self) -> None:
+        """Make the next fetch return the tree even if it is unchanged, e.g. after a local patch."""
+        self._tree_etag = None
+        self._tree_digest = None
+        self._tree_generation += 1
+
+    async def _get_device_tree_response(self, headers: dict[str, str]) -> Response:
+        async with asyncio.timeout(DEVICE_TREE_DEADLINE.total_seconds()):
+            return await self._send(
+                "GET", "/device_groups/tree", headers=headers, timeout=operation_timeout(DEVICE_TREE_TIMEOUT)
+            )
+
+    def _remember_device_tree(self, res: Response, digest: bytes) -> DeviceTreeNode:
+        tree = _decode_device_tree_response(json_loads(res.content))
+        self._tree_etag = res.headers.get("ETag")
+        self._tree_digest = digest
+        return tree
+
+    async def get_devices(self, compact: bool = False) -> DeviceCache:
+        return extract_devices(await self.get_device_tree(), compact=compact)
 
     async def async_get_devices(self) -> DeviceCache:
         return await self.get_devices()
 
+    async def stream_device_events(self) -> AsyncIterator[DeviceStateEvent]:
+        """Yield device state events from the push channel until the server closes it.
+
+        The channel is a long-lived GET of ``events_url`` on the gateway returning
+        newline-delimited JSON messages. The gateway documents no such endpoint,
+        so the channel is only enabled by passing ``events_url`` explicitly.
+        """
+        if self._events_url is None:
+            raise RuntimeError("Gateway push channel is not configured")
+
+        token = await self._ensure_gateway_token()
+        async with self._client.stream(
+            "GET", self._events_url, timeout=Timeout(HTTP_CONNECT_TIMEOUT.total_seconds(), read=None)
+        ) as res:
+            if res.status_code != 200:
+                payload = json_loads(await res.aread())
+                if payload["code"] == 16:
+                    self._invalidate_gateway_token(token)
+                raise self._error(res, payload)
+
+            async for line in res.aiter_lines():
+                if not line.strip():
+                    continue
+                if (event := _decode_device_event(json_loads(line))) is not None:
+                    yield event
+
     async def set_device_state(self, device_id: str, state: list[DeviceState]) -> None:
-        await self._request(
-            "PUT",
-            f"/devices/{device_id}/state",
-            json={
-                "device_id": device_id,
-                "desired_state": state,
-                "timestamp": datetime.now(tz=UTC).isoformat().replace("+00:00", "Z"),
-            },
+        """Queue a state write, merging it with writes still pending for the device."""
+        await self._write_queue.write(device_id, state)
+
+    async def set_devices_state(self, states: Mapping[str, list[DeviceState]]) -> None:
+        """Queue writes to several devices at once, raising the first failure after all have finished.
+
+        The writes flush together, within the write queue's concurrency limit.
+        """
+        results = await asyncio.gather(
+            *(self._write_queue.write(device_id, state) for device_id, state in states.items()),
+            return_exceptions=True,
         )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+    async def _put_device_state(self, device_id: str, state: list[DeviceState]) -> None:
+        # Writes run under a tighter deadline than tree polls.
+        async with asyncio.timeout(STATE_WRITE_DEADLINE.total_seconds()):
+            await self._request(
+                "PUT",
+                f"/devices/{device_id}/state",
+                json={
+                    "device_id": device_id,
+                    "desired_state": state,
+                    "timestamp": datetime.now(tz=UTC).isoformat().replace("+00:00", "Z"),
+                },
+                timeout=operation_timeout(STATE_WRITE_TIMEOUT),
+            )
 
 
 HomeAPI = SberHomeGatewayClient
@@ -0,0 +1,298 @@
+"""Request and processing metrics for the SberDevices integration."""
+
+from __future__ import annotations
+
+import bisect
+import logging
+import re
+from collections import Counter, deque
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from typing import Any
+
+from ..const import (
+    COMMAND_CONVERGENCE_TIMEOUT,
+    COMMAND_FAILURE_HISTORY,
+    METRICS_LATENCY_BUCKETS,
+    METRICS_WINDOW,
+)
+from .snapshot import DeviceRecord, DeviceState, StateValue, decode_state_value
+
+_LOGGER = logging.getLogger(__name__)
+
+_DEVICE_PATH = re.compile(r"/devices/[^/]+/")
+
+
+def endpoint_name(method: str, url: str) -> str:
+    """Return a low-cardinality endpoint label, with device ids replaced by ``{id}``."""
+    return f"{method} {_DEVICE_PATH.sub('/devices/{id}/', url)}"
+
+
+@dataclass(slots=True)
+class LatencyHistogram:
+    """Cumulative latency histogram with a window of recent samples for percentiles.
+
+    Bucket bounds are upper limits in milliseconds; the last bucket counts
+    everything above the largest bound.
+    """
+
+    bounds: tuple[float, ...] = METRICS_LATENCY_BUCKETS
+    buckets: list[int] = field(default_factory=list)
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+    recent: deque[float] = field(default_factory=lambda: deque(maxlen=METRICS_WINDOW))
+
+    def __post_init__(self) -> None:
+        if not self.buckets:
+            self.buckets = [0] * (len(self.bounds) + 1)
+
+    def record(self, seconds: float) -> None:
+        milliseconds = seconds * 1000
+        self.buckets[bisect.bisect_left(self.bounds, milliseconds)] += 1
+        self.count += 1
+        self.total += milliseconds
+        self.max = max(self.max, milliseconds)
+        self.recent.append(milliseconds)
+
+    def percentile(self, share: float) -> float | None:
+        """Return the ``share`` percentile of recent samples in milliseconds."""
+        if not self.recent:
+            return None
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * share))]
+
+    def as_dict(self) -> dict[str, Any]:
+        labels = [f"<={bound:g}" for bound in self.bounds] + [f">{self.bounds[-1]:g}"]
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count, 1) if self.count else None,
+            "max_ms": round(self.max, 1),
+            "p50_ms": _rounded(self.percentile(0.5)),
+            "p95_ms": _rounded(self.percentile(0.95)),
+            "buckets_ms": dict(zip(labels, self.buckets, strict=True)),
+        }
+
+
+def _rounded(value: float | None) -> float | None:
+    return None if value is None else round(value, 1)
+
+
+@dataclass(slots=True)
+class EndpointMetrics:
+    """Latency, payload sizes, retries and errors of one gateway endpoint."""
+
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    requests: int = 0
+    retries: int = 0
+    unchanged: int = 0
+    request_bytes: int = 0
+    response_bytes: int = 0
+    last_response_bytes: int = 0
+    errors: Counter[str] = field(default_factory=Counter)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "unchanged": self.unchanged,
+            "errors": dict(self.errors),
+            "request_bytes": self.request_bytes,
+            "response_bytes": self.response_bytes,
+            "last_response_bytes": self.last_response_bytes,
+            "latency": self.latency.as_dict(),
+        }
+
+
+class PerformanceMetrics:
+    """Per-endpoint gateway request metrics and timings of local processing stages."""
+
+    def __init__(self) -> None:
+        self.endpoints: dict[str, EndpointMetrics] = {}
+        self.stages: dict[str, LatencyHistogram] = {}
+
+    def endpoint(self, name: str) -> EndpointMetrics:
+        metrics = self.endpoints.get(name)
+        if metrics is None:
+            metrics = self.endpoints[name] = EndpointMetrics()
+        return metrics
+
+    def record_request(
+        self,
+        endpoint: str,
+        seconds: float,
+        request_bytes: int = 0,
+        response_bytes: int = 0,
+        error: str | None = None,
+    ) -> None:
+        metrics = self.endpoint(endpoint)
+        metrics.requests += 1
+        metrics.latency.record(seconds)
+        metrics.request_bytes += request_bytes
+        metrics.response_bytes += response_bytes
+        if response_bytes:
+            metrics.last_response_bytes = response_bytes
+        if error is not None:
+            metrics.errors[error] += 1
+
+    def record_retry(self, endpoint: str) -> None:
+        self.endpoint(endpoint).retries += 1
+
+    def record_stage(self, stage: str, seconds: float) -> None:
+        histogram = self.stages.get(stage)
+        if histogram is None:
+            histogram = self.stages[stage] = LatencyHistogram()
+        histogram.record(seconds)
+
+    def latency_percentile(self, endpoint: str, share: float) -> float | None:
+        metrics = self.endpoints.get(endpoint)
+        return None if metrics is None else metrics.latency.percentile(share)
+
+    def stage_percentile(self, stage: str, share: float) -> float | None:
+        histogram = self.stages.get(stage)
+        return None if histogram is None else histogram.percentile(share)
+
+    @property
+    def total_errors(self) -> int:
+        return sum(metrics.errors.total() for metrics in self.endpoints.values())
+
+    @property
+    def total_retries(self) -> int:
+        return sum(metrics.retries for metrics in self.endpoints.values())
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "endpoints": {name: metrics.as_dict() for name, metrics in self.endpoints.items()},
+            "stages": {name: histogram.as_dict() for name, histogram in self.stages.items()},
+        }
+
+
+@dataclass(slots=True)
+class PendingCommand:
+    """Desired values of one command still waiting to show up in ``reported_state``."""
+
+    sent_at: float
+    values: dict[str, StateValue]
+
+
+@dataclass(slots=True)
+class DeviceCommandMetrics:
+    """Command round-trip outcomes of one device."""
+
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    converged: int = 0
+    not_converged: int = 0
+    unreported: int = 0
+    superseded: int = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "converged": self.converged,
+            "not_converged": self.not_converged,
+            "unreported": self.unreported,
+            "superseded": self.superseded,
+            "latency": self.latency.as_dict(),
+        }
+
+
+class CommandTracker:
+    """Track how long commands take until the device reports the commanded values.
+
+    A command converges once every commanded key that the device reports has
+    the commanded value in ``reported_state``. Latency is measured when the
+    coordinator observes the reported values, so it includes the wait for the
+    next poll or push event. Commands still pending after ``timeout`` are
+    flagged as not converged, or as unreported when the device never reported
+    any of their keys. A newer command takes over keys from older pending
+    ones; an older command left without keys counts as superseded.
+    """
+
+    def __init__(self, timeout: float = COMMAND_CONVERGENCE_TIMEOUT.total_seconds()) -> None:
+        self._timeout = timeout
+        self._pending: dict[str, list[PendingCommand]] = {}
+        self.devices: dict[str, DeviceCommandMetrics] = {}
+        self.recent_failures: deque[dict[str, Any]] = deque(maxlen=COMMAND_FAILURE_HISTORY)
+
+    def _device(self, device_id: str) -> DeviceCommandMetrics:
+        metrics = self.devices.get(device_id)
+        if metrics is None:
+            metrics = self.devices[device_id] = DeviceCommandMetrics()
+        return metrics
+
+    @property
+    def pending_devices(self) -> frozenset[str]:
+        return frozenset(self._pending)
+
+    def record_command(self, device_id: str, states: list[DeviceState], now: float) -> None:
+        values = {state["key"]: decode_state_value(state) for state in states}
+        pending = self._pending.setdefault(device_id, [])
+        for command in list(pending):
+            for key in values.keys() & command.values.keys():
+                del command.values[key]
+            if not command.values:
+                pending.remove(command)
+                self._device(device_id).superseded += 1
+        pending.append(PendingCommand(now, values))
+
+    def cancel(self, device_id: str, states: list[DeviceState]) -> None:
+        """Stop tracking the keys of a command whose write failed."""
+        keys = {state["key"] for state in states}
+        pending = self._pending.get(device_id, [])
+        for command in list(pending):
+            for key in keys & command.values.keys():
+                del command.values[key]
+            if not command.values:
+                pending.remove(command)
+        if not pending:
+            self._pending.pop(device_id, None)
+
+    def check(self, device_id: str, device: DeviceRecord, now: float) -> None:
+        """Resolve pending commands of ``device_id`` against its reported state."""
+        pending = self._pending.get(device_id)
+        if not pending:
+            return
+
+        metrics = self._device(device_id)
+        for command in list(pending):
+            reported = {key: device.reported_value(key) for key in command.values if key in device.reported_state}
+            if reported and all(command.values[key] == value for key, value in reported.items()):
+                metrics.converged += 1
+                metrics.latency.record(now - command.sent_at)
+                pending.remove(command)
+            elif now - command.sent_at > self._timeout:
+                self._flag(device_id, command, reported, now)
+                pending.remove(command)
+        if not pending:
+            del self._pending[device_id]
+
+    def check_all(self, devices: Mapping[str, DeviceRecord], now: float) -> None:
+        """Resolve every pending command, dropping those of devices that disappeared."""
+        for device_id in self.pending_devices:
+            device = devices.get(device_id)
+            if device is None:
+                del self._pending[device_id]
+            else:
+                self.check(device_id, device, now)
+
+    def _flag(self, device_id: str, command: PendingCommand, reported: dict[str, StateValue], now: float) -> None:
+        metrics = self._device(device_id)
+        if reported:
+            metrics.not_converged += 1
+            _LOGGER.debug("Command to %s did not converge: sent %s, reported %s", device_id, command.values, reported)
+        else:
+            metrics.unreported += 1
+        self.recent_failures.append(
+            {
+                "device_id": device_id,
+                "age_s": round(now - command.sent_at, 1),
+                "desired": command.values,
+                "reported": reported,
+            }
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "pending": {device_id: len(commands) for device_id, commands in self._pending.items()},
+            "devices": {device_id: metrics.as_dict() for device_id, metrics in self.devices.items()},
+            "recent_failures": list(self.recent_failures),
+        }
@@ -0,0 +1,128 @@
+"""Adaptive polling schedule and the shared polling engine for the SberDevices integration."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Any
+
+from ..const import (
+    COORDINATOR_UPDATE_INTERVAL,
+    POLL_ACTIVE_WINDOW,
+    POLL_ERROR_BACKOFF_MAX,
+    POLL_MAX_CONCURRENCY,
+    POLL_STAGGER,
+)
+from .transport import SberHttpTransport
+
+
+@dataclass(slots=True)
+class AdaptivePollSchedule:
+    """Pick the next poll interval from recent activity and gateway errors.
+
+    Polls run at ``min_interval`` for ``active_window`` after a command was
+    sent. Activity seen by a poll keeps the base interval, the larger of
+    ``COORDINATOR_UPDATE_INTERVAL`` and ``min_interval``, for ``active_window``.
+    Otherwise the interval doubles on every quiet poll up to ``max_interval``.
+    Consecutive failures double the interval up to ``POLL_ERROR_BACKOFF_MAX``.
+    """
+
+    min_interval: timedelta
+    max_interval: timedelta
+    active_window: timedelta = POLL_ACTIVE_WINDOW
+    base_interval: timedelta = field(init=False)
+    interval: timedelta = field(init=False)
+    _fast_until: float = field(default=0.0, init=False)
+    _active_until: float = field(default=0.0, init=False)
+
+    def __post_init__(self) -> None:
+        self.base_interval = min(max(COORDINATOR_UPDATE_INTERVAL, self.min_interval), self.max_interval)
+        self.interval = self.base_interval
+
+    def mark_active(self) -> timedelta:
+        """Switch to fast polling after a command was sent."""
+        self._fast_until = self._active_until = time.monotonic() + self.active_window.total_seconds()
+        self.interval = self.min_interval
+        return self.interval
+
+    def record_success(self, active: bool) -> timedelta:
+        now = time.monotonic()
+        if active:
+            self._active_until = max(self._active_until, now + self.active_window.total_seconds())
+        if now < self._fast_until:
+            self.interval = self.min_interval
+        elif now < self._active_until:
+            self.interval = self.base_interval
+        else:
+            self.interval = min(self.interval * 2, self.max_interval)
+        return self.interval
+
+    def record_failure(self) -> timedelta:
+        self._fast_until = self._active_until = 0.0
+        self.interval = min(max(self.interval, self.min_interval) * 2, max(POLL_ERROR_BACKOFF_MAX, self.max_interval))
+        return self.interval
+
+
+class PollingEngine:
+    """Polling resources shared by every config entry of the domain.
+
+    All accounts share one ``transport`` connection pool. Each entry keeps
+    its own auth and gateway clients, so OAuth tokens, gateway tokens and
+    cookies stay per account.
+
+    Tree polls of all entries pass through ``poll_slot``: at most
+    ``max_concurrency`` run at once and their starts are at least
+    ``stagger`` seconds apart. Entries whose timers fire together, such as
+    after a restart, are staggered instead of polling in lockstep, and since
+    every coordinator schedules its next poll from the end of the previous
+    one, the offsets persist.
+    """
+
+    def __init__(
+        self,
+        transport: SberHttpTransport,
+        max_concurrency: int = POLL_MAX_CONCURRENCY,
+        stagger: float = POLL_STAGGER.total_seconds(),
+    ) -> None:
+        self.transport = transport
+        self.entry_ids: set[str] = set()
+        self._max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._stagger = stagger
+        self._next_start = 0.0
+        self.polls = 0
+        self.delayed = 0
+
+    @asynccontextmanager
+    async def poll_slot(self) -> AsyncGenerator[float]:
+        """Hold a slot of the global poll budget, yielding the seconds spent waiting for it."""
+        loop = asyncio.get_running_loop()
+        requested = loop.time()
+        delayed = self._semaphore.locked()
+        async with self._semaphore:
+            now = loop.time()
+            start = max(now, self._next_start)
+            self._next_start = start + self._stagger
+            if start > now:
+                delayed = True
+                await asyncio.sleep(start - now)
+            self.polls += 1
+            if delayed:
+                self.delayed += 1
+            yield loop.time() - requested
+
+    async def async_close(self) -> None:
+        await self.transport.async_close()
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "entries": len(self.entry_ids),
+            "max_concurrency": self._max_concurrency,
+            "stagger_s": self._stagger,
+            "polls": self.polls,
+            "delayed": self.delayed,
+        }
@@ -5,10 +5,39 @@ from __future__ import annotations
 from dataclasses import dataclass
 
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.util.hass_dict import HassKey
 
+from ..const import DOMAIN
 from .auth import SberAuthClient
 from .coordinator import SberDataUpdateCoordinator
 from .gateway import SberHomeGatewayClient
+from .polling import PollingEngine
+from .transport import SberHttpTransport, async_get_ssl_context
+
+POLLING_ENGINE: HassKey[PollingEngine] = HassKey(DOMAIN)
+
+
+async def async_acquire_polling_engine(hass: HomeAssistant, entry_id: str) -> PollingEngine:
+    """Return the domain's polling engine, creating it for the first entry."""
+    ssl_context = await async_get_ssl_context()
+    engine = hass.data.get(POLLING_ENGINE)
+    if engine is None:
+        engine = hass.data[POLLING_ENGINE] = PollingEngine(SberHttpTransport(ssl_context=ssl_context))
+    engine.entry_ids.add(entry_id)
+    return engine
+
+
+async def async_release_polling_engine(hass: HomeAssistant, entry_id: str) -> None:
+    """Detach an entry from the polling engine, closing the engine with the last entry."""
+    engine = hass.data.get(POLLING_ENGINE)
+    if engine is None:
+        return
+
+    engine.entry_ids.discard(entry_id)
+    if not engine.entry_ids:
+        del hass.data[POLLING_ENGINE]
+        await engine.async_close()
 
 
 @dataclass(slots=True)
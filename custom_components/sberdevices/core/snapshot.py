@@ -2,12 +2,16 @@
 
 from __future__ import annotations
 
-from collections.abc import Iterable
+import sys
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from types import MappingProxyType
 from typing import Any, NotRequired, TypedDict
 
 type KeyedPayload = dict[str, Any]
 type DeviceState = KeyedPayload
 type DeviceAttribute = KeyedPayload
+type StateValue = bool | int | float | str | dict[str, Any] | None
 
 
 class DeviceName(TypedDict):
@@ -40,12 +44,21 @@ class DeviceSnapshot(TypedDict):
 class DeviceTreeNode(TypedDict):
     """Nested gateway device tree."""
 
+    id: NotRequired[str]
+    name: NotRequired[str | DeviceName]
     devices: list[DeviceSnapshot]
     children: list[DeviceTreeNode]
 
 
+class DeviceStateEvent(TypedDict):
+    """Incremental device state update from the gateway push channel."""
+
+    device_id: str
+    desired_state: NotRequired[list[DeviceState]]
+    reported_state: NotRequired[list[DeviceState]]
+
+
 type DeviceData = DeviceSnapshot
-type DeviceCache = dict[str, DeviceSnapshot]
 
 
 def find_by_key[T: KeyedPayload](items: Iterable[T], key: str) -> T | None:
@@ -53,17 +66,426 @@ def find_by_key[T: KeyedPayload](items: Iterable[T], key: str) -> T | None:
     return next((item for item in items if item.get("key") == key), None)
 
 
-def extract_devices(tree: DeviceTreeNode) -> DeviceCache:
-    """Flatten the nested device tree into a device-id keyed snapshot."""
-    devices: DeviceCache = {device["id"]: device for device in tree["devices"]}
-    for child_tree in tree["children"]:
-        devices.update(extract_devices(child_tree))
+def index_by_key[T: KeyedPayload](items: Iterable[T]) -> dict[str, T]:
+    """Map keyed payload entries by ``key``, keeping the first entry per key like ``find_by_key``."""
+    index: dict[str, T] = {}
+    for item in items:
+        key = item.get("key")
+        if isinstance(key, str) and key not in index:
+            index[key] = item
+    return index
+
+
+_VALUE_FIELDS = {
+    "BOOL": "bool_value",
+    "INTEGER": "integer_value",
+    "FLOAT": "float_value",
+    "ENUM": "enum_value",
+    "STRING": "string_value",
+    "COLOR": "color_value",
+}
+
+
+def decode_state_value(state: DeviceState) -> StateValue:
+    """Return the typed value of a state payload.
+
+    The field is picked by ``type`` when present, otherwise by which value field
+    is set. ``integer_value`` arrives as a string and is returned as an int.
+    ``float_value`` is returned as a float even when the JSON number is integral,
+    so callers can tell the two types apart.
+    """
+    field = _VALUE_FIELDS.get(state.get("type", ""))
+    if field is None:
+        field = next((field for field in _VALUE_FIELDS.values() if field in state), None)
+        if field is None:
+            return None
+
+    value = state.get(field)
+    if value is None:
+        return None
+    if field == "integer_value":
+        return int(value)
+    if field == "float_value":
+        return float(value)
+    return value
+
+
+def encode_state_value(key: str, value: StateValue) -> DeviceState:
+    """Build a state payload for a decoded value; strings are encoded as enums."""
+    if isinstance(value, bool):
+        return {"key": key, "type": "BOOL", "bool_value": value}
+    if isinstance(value, int):
+        return {"key": key, "type": "INTEGER", "integer_value": str(value)}
+    if isinstance(value, float):
+        return {"key": key, "type": "FLOAT", "float_value": value}
+    if isinstance(value, str):
+        return {"key": key, "type": "ENUM", "enum_value": value}
+    if isinstance(value, dict):
+        return {"key": key, "type": "COLOR", "color_value": value}
+    return {"key": key}
+
+
+def _merge_states(states: list[DeviceState], index: dict[str, DeviceState], patch: list[DeviceState]) -> bool:
+    changed = False
+    for patched_state in patch:
+        key = patched_state["key"]
+        state = index.get(key)
+        if state is None:
+            state = dict(patched_state)
+            states.append(state)
+            index[key] = state
+            changed = True
+        elif any(state.get(field) != value for field, value in patched_state.items()):
+            state.update(patched_state)
+            changed = True
+    return changed
+
+
+@dataclass(slots=True)
+class DeviceIndex:
+    """Raw device snapshot with keyed views over its state and attribute lists.
+
+    The views reference the snapshot's own payload dicts, so in-place updates
+    to those dicts are visible through both the lists and the index.
+    """
+
+    snapshot: DeviceSnapshot
+    desired_state: dict[str, DeviceState]
+    reported_state: dict[str, DeviceState]
+    attributes: dict[str, DeviceAttribute]
+
+    @classmethod
+    def from_snapshot(cls, device: DeviceSnapshot) -> DeviceIndex:
+        return cls(
+            snapshot=device,
+            desired_state=index_by_key(device["desired_state"]),
+            reported_state=index_by_key(device.get("reported_state", ())),
+            attributes=index_by_key(device["attributes"]),
+        )
+
+    @property
+    def id(self) -> str:
+        return self.snapshot["id"]
+
+    @property
+    def name(self) -> str:
+        return self.snapshot["name"]["name"]
+
+    @property
+    def serial_number(self) -> str:
+        return self.snapshot["serial_number"]
+
+    @property
+    def manufacturer(self) -> str:
+        return self.snapshot["device_info"]["manufacturer"]
+
+    @property
+    def model(self) -> str:
+        return self.snapshot["device_info"]["model"]
+
+    @property
+    def sw_version(self) -> str:
+        return self.snapshot["sw_version"]
+
+    @property
+    def image_set_type(self) -> str:
+        return self.snapshot["image_set_type"]
+
+    def desired_value(self, key: str) -> StateValue:
+        """Return the decoded desired value of ``key``; raises ``KeyError`` when missing."""
+        return decode_state_value(self.desired_state[key])
+
+    def reported_value(self, key: str) -> StateValue:
+        state = self.reported_state.get(key)
+        return None if state is None else decode_state_value(state)
+
+    def apply_patch(self, state_patch: list[DeviceState]) -> None:
+        for patched_state in state_patch:
+            desired_state = self.desired_state.get(patched_state["key"])
+            if desired_state is not None:
+                desired_state.update(patched_state)
+
+    def merge_event(self, event: DeviceStateEvent) -> bool:
+        changed = False
+        if "desired_state" in event:
+            changed |= _merge_states(self.snapshot["desired_state"], self.desired_state, event["desired_state"])
+        if "reported_state" in event:
+            reported_state = self.snapshot.setdefault("reported_state", [])
+            changed |= _merge_states(reported_state, self.reported_state, event["reported_state"])
+        return changed
+
+    def to_snapshot(self) -> DeviceSnapshot:
+        return self.snapshot
+
+
+# Attribute maps shared by devices of the same model, with the attribute lists they were built from.
+type AttributeProfiles = dict[str, list[tuple[list[DeviceAttribute], Mapping[str, DeviceAttribute]]]]
+
+
+def intern_attributes(
+    attribute_profiles: AttributeProfiles, model: str, attributes: list[DeviceAttribute]
+) -> Mapping[str, DeviceAttribute]:
+    """Return a read-only keyed attribute map shared across devices of ``model`` with equal attributes."""
+    profiles = attribute_profiles.setdefault(model, [])
+    for profile_attributes, profile in profiles:
+        if profile_attributes == attributes:
+            return profile
+
+    profile = MappingProxyType(index_by_key(attributes))
+    profiles.append((attributes, profile))
+    return profile
+
+
+def _decode_states(states: Iterable[DeviceState]) -> dict[str, StateValue]:
+    values: dict[str, StateValue] = {}
+    for state in states:
+        key = state.get("key")
+        if isinstance(key, str) and key not in values:
+            values[sys.intern(key)] = decode_state_value(state)
+    return values
+
+
+def _merge_values(values: dict[str, StateValue], patch: list[DeviceState]) -> bool:
+    changed = False
+    for patched_state in patch:
+        key = sys.intern(patched_state["key"])
+        value = decode_state_value(patched_state)
+        if key not in values or values[key] != value:
+            values[key] = value
+            changed = True
+    return changed
+
+
+@dataclass(slots=True)
+class CompactDevice:
+    """Compact device snapshot with decoded state values.
+
+    Only the fields entities read are kept. Repeated strings are interned and
+    ``attributes`` is shared with other devices of the same model and
+    attribute set in the same ``DeviceCache``, so it must not be mutated.
+    """
+
+    id: str
+    name: str
+    serial_number: str
+    manufacturer: str
+    model: str
+    sw_version: str
+    image_set_type: str
+    desired_state: dict[str, StateValue]
+    reported_state: dict[str, StateValue]
+    attributes: Mapping[str, DeviceAttribute]
+
+    @classmethod
+    def from_snapshot(
+        cls, device: DeviceSnapshot, attribute_profiles: AttributeProfiles | None = None
+    ) -> CompactDevice:
+        """Build a record; devices built with the same ``attribute_profiles`` share attribute maps."""
+        model = sys.intern(device["device_info"]["model"])
+        return cls(
+            id=device["id"],
+            name=device["name"]["name"],
+            serial_number=device["serial_number"],
+            manufacturer=sys.intern(device["device_info"]["manufacturer"]),
+            model=model,
+            sw_version=sys.intern(device["sw_version"]),
+            image_set_type=sys.intern(device["image_set_type"]),
+            desired_state=_decode_states(device["desired_state"]),
+            reported_state=_decode_states(device.get("reported_state", ())),
+            attributes=intern_attributes(
+                {} if attribute_profiles is None else attribute_profiles, model, device["attributes"]
+            ),
+        )
+
+    def desired_value(self, key: str) -> StateValue:
+        """Return the decoded desired value of ``key``; raises ``KeyError`` when missing."""
+        return self.desired_state[key]
+
+    def reported_value(self, key: str) -> StateValue:
+        return self.reported_state.get(key)
+
+    def apply_patch(self, state_patch: list[DeviceState]) -> None:
+        for patched_state in state_patch:
+            key = patched_state["key"]
+            if key in self.desired_state:
+                self.desired_state[key] = decode_state_value(patched_state)
+
+    def merge_event(self, event: DeviceStateEvent) -> bool:
+        changed = False
+        if "desired_state" in event:
+            changed |= _merge_values(self.desired_state, event["desired_state"])
+        if "reported_state" in event:
+            changed |= _merge_values(self.reported_state, event["reported_state"])
+        return changed
+
+    def to_snapshot(self) -> DeviceSnapshot:
+        """Rebuild a gateway-shaped snapshot, e.g. for storage."""
+        return {
+            "id": self.id,
+            "name": {"name": self.name},
+            "serial_number": self.serial_number,
+            "device_info": {"manufacturer": self.manufacturer, "model": self.model},
+            "sw_version": self.sw_version,
+            "image_set_type": self.image_set_type,
+            "desired_state": [encode_state_value(key, value) for key, value in self.desired_state.items()],
+            "reported_state": [encode_state_value(key, value) for key, value in self.reported_state.items()],
+            "attributes": list(self.attributes.values()),
+        }
+
+
+type DeviceRecord = DeviceIndex | CompactDevice
+
+
+# Joins the parent id and node position into an id for tree nodes the gateway sent without one.
+_POSITIONAL_ID_SEPARATOR = "/"
+
+
+@dataclass(slots=True, frozen=True)
+class DeviceGroup:
+    """Group or room node of the gateway device tree."""
+
+    id: str
+    name: str | None
+    parent_id: str | None
+
+    @property
+    def has_gateway_id(self) -> bool:
+        """Return whether ``id`` came from the gateway rather than the node's position in the tree."""
+        return _POSITIONAL_ID_SEPARATOR not in self.id
+
+
+class DeviceCache(dict[str, DeviceRecord]):
+    """Device-id keyed snapshot of per-device records.
+
+    Records are ``DeviceIndex`` views over the raw gateway payload, or
+    ``CompactDevice`` when the cache is built with ``compact=True``.
+
+    ``groups`` holds the tree's group nodes by id and ``device_groups`` maps
+    each device id to the id of the group it was listed in.
+    """
+
+    __slots__ = ("_attribute_profiles", "compact", "device_groups", "groups")
+
+    def __init__(self, compact: bool = False) -> None:
+        super().__init__()
+        self.compact = compact
+        self.groups: dict[str, DeviceGroup] = {}
+        self.device_groups: dict[str, str] = {}
+        # Freed with the snapshot, so reloads and removed entries do not keep attribute maps alive.
+        self._attribute_profiles: AttributeProfiles = {}
+
+    def add(self, device: DeviceSnapshot) -> DeviceRecord:
+        """Store a record for ``device``, replacing any previous one with the same id."""
+        if self.compact:
+            record = CompactDevice.from_snapshot(device, self._attribute_profiles)
+        else:
+            record = DeviceIndex.from_snapshot(device)
+        self[device["id"]] = record
+        return record
+
+    def __delitem__(self, device_id: str) -> None:
+        super().__delitem__(device_id)
+        self.device_groups.pop(device_id, None)
+
+    def group_path(self, device_id: str) -> tuple[str, ...]:
+        """Return the names of the groups containing ``device_id``, outermost first."""
+        names: list[str] = []
+        group_id = self.device_groups.get(device_id)
+        while group_id is not None and (group := self.groups.get(group_id)) is not None:
+            if group.name:
+                names.append(group.name)
+            group_id = group.parent_id
+        return tuple(reversed(names))
+
+
+def _node_name(node: DeviceTreeNode) -> str | None:
+    name = node.get("name")
+    if isinstance(name, dict):
+        name = name.get("name")
+    return name if isinstance(name, str) else None
+
+
+def extract_devices(tree: DeviceTreeNode, compact: bool = False) -> DeviceCache:
+    """Flatten the nested device tree into a device-id keyed snapshot.
+
+    The tree is walked iteratively in pre-order, so a device listed twice keeps
+    its last occurrence and deep trees cannot hit the recursion limit.
+    """
+    devices = DeviceCache(compact)
+    stack: list[tuple[DeviceTreeNode, str | None]] = [(tree, None)]
+    while stack:
+        node, parent_id = stack.pop()
+        group_id = node.get("id") or f"{parent_id or ''}{_POSITIONAL_ID_SEPARATOR}{len(devices.groups)}"
+        devices.groups[group_id] = DeviceGroup(group_id, _node_name(node), parent_id)
+        for device in node["devices"]:
+            devices.add(device)
+            devices.device_groups[device["id"]] = group_id
+        stack.extend((child, group_id) for child in reversed(node["children"]))
     return devices
 
 
-def apply_device_state_patch(device: DeviceData, state_patch: list[DeviceState]) -> None:
+@dataclass(slots=True, frozen=True)
+class DeviceCacheDiff:
+    """Device ids that differ between two snapshots."""
+
+    added: frozenset[str] = frozenset()
+    removed: frozenset[str] = frozenset()
+    changed: frozenset[str] = frozenset()
+    # Whether the difference looks like use of the home rather than meter drift.
+    active: bool = False
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+
+def _state_changed(previous: DeviceRecord, current: DeviceRecord) -> bool:
+    return previous.desired_state != current.desired_state or previous.reported_state != current.reported_state
+
+
+# Reported keys that follow commands and people; meter readings such as cur_power drift on their own.
+_ACTIVITY_REPORTED_KEYS = ("on_off", "online")
+
+
+def _state_active(previous: DeviceRecord, current: DeviceRecord) -> bool:
+    return previous.desired_state != current.desired_state or any(
+        previous.reported_value(key) != current.reported_value(key) for key in _ACTIVITY_REPORTED_KEYS
+    )
+
+
+def diff_device_caches(previous: DeviceCache, current: DeviceCache) -> DeviceCacheDiff:
+    """Compare two snapshots by device id and by desired/reported state."""
+    previous_ids = previous.keys()
+    current_ids = current.keys()
+    added = frozenset(current_ids - previous_ids)
+    removed = frozenset(previous_ids - current_ids)
+    changed = frozenset(
+        device_id for device_id in current_ids & previous_ids if _state_changed(previous[device_id], current[device_id])
+    )
+    return DeviceCacheDiff(
+        added=added,
+        removed=removed,
+        changed=changed,
+        active=bool(added or removed)
+        or any(_state_active(previous[device_id], current[device_id]) for device_id in changed),
+    )
+
+
+def merge_state_patches(*patches: list[DeviceState]) -> list[DeviceState]:
+    """Merge state patches by key; the last write of a key wins and moves to the end."""
+    states_by_key: dict[str, DeviceState] = {}
+    for patch in patches:
+        for state in patch:
+            key = state["key"]
+            states_by_key.pop(key, None)
+            states_by_key[key] = state
+    return list(states_by_key.values())
+
+
+def apply_device_state_patch(device: DeviceRecord, state_patch: list[DeviceState]) -> None:
     """Optimistically patch a device snapshot after a successful state write."""
-    for patched_state in state_patch:
-        desired_state = find_by_key(device["desired_state"], patched_state["key"])
-        if desired_state is not None:
-            desired_state.update(patched_state)
+    device.apply_patch(state_patch)
+
+
+def apply_device_state_event(devices: DeviceCache, event: DeviceStateEvent) -> bool:
+    """Merge a pushed state event into the snapshot and report whether anything changed."""
+    return devices[event["device_id"]].merge_event(event)
@@ -0,0 +1,52 @@
+"""Persistent snapshot cache for the SberDevices integration."""
+
+from __future__ import annotations
+
+from typing import NotRequired, TypedDict
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from ..const import DOMAIN
+from .snapshot import DeviceCache, DeviceGroup, DeviceSnapshot
+
+STORAGE_VERSION = 1
+
+
+class StoredGroup(TypedDict):
+    """Group node of a saved snapshot."""
+
+    name: str | None
+    parent_id: str | None
+
+
+class StoredSnapshot(TypedDict):
+    """Last good device snapshot of a config entry."""
+
+    devices: dict[str, DeviceSnapshot]
+    groups: NotRequired[dict[str, StoredGroup]]
+    device_groups: NotRequired[dict[str, str]]
+
+
+def snapshot_store(hass: HomeAssistant, entry_id: str) -> Store[StoredSnapshot]:
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.snapshot", private=True)
+
+
+def dump_snapshot(devices: DeviceCache) -> StoredSnapshot:
+    return {
+        "devices": {device_id: device.to_snapshot() for device_id, device in devices.items()},
+        "groups": {group.id: {"name": group.name, "parent_id": group.parent_id} for group in devices.groups.values()},
+        "device_groups": dict(devices.device_groups),
+    }
+
+
+def load_snapshot(stored: StoredSnapshot, compact: bool = False) -> DeviceCache:
+    devices = DeviceCache(compact)
+    for device in stored["devices"].values():
+        devices.add(device)
+    devices.groups = {
+        group_id: DeviceGroup(group_id, group["name"], group["parent_id"])
+        for group_id, group in stored.get("groups", {}).items()
+    }
+    devices.device_groups = dict(stored.get("device_groups", {}))
+    return devices
@@ -0,0 +1,110 @@
+"""Shared HTTP transport for the SberDevices integration."""
+
+from __future__ import annotations
+
+import asyncio
+import ssl
+from datetime import timedelta
+from importlib.util import find_spec
+from pathlib import Path
+
+from httpx import AsyncBaseTransport, AsyncHTTPTransport, Limits, Request, Response, Timeout
+
+from ..const import (
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_DEFAULT_TIMEOUT,
+    HTTP_KEEPALIVE_EXPIRY,
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE_CONNECTIONS,
+)
+
+_ROOT_CA_PATH = Path(__file__).parent / "russian_trusted_root_ca.pem"
+
+
+_ssl_context: ssl.SSLContext | None = None
+
+
+def _create_ssl_context() -> ssl.SSLContext:
+    ctx = ssl.create_default_context()
+    ctx.load_verify_locations(cafile=str(_ROOT_CA_PATH))
+    return ctx
+
+
+def get_ssl_context() -> ssl.SSLContext:
+    """Return the process-wide SSL context that also trusts the bundled Russian root CA.
+
+    The first call loads CA files from disk, so on the event loop use
+    ``async_get_ssl_context`` instead.
+    """
+    global _ssl_context
+    if _ssl_context is None:
+        _ssl_context = _create_ssl_context()
+    return _ssl_context
+
+
+async def async_get_ssl_context() -> ssl.SSLContext:
+    """Return the shared SSL context, building it in the executor on first use."""
+    if _ssl_context is not None:
+        return _ssl_context
+    return await asyncio.get_running_loop().run_in_executor(None, get_ssl_context)
+
+
+def http2_available() -> bool:
+    """Return whether the optional ``h2`` package needed for HTTP/2 is installed."""
+    return find_spec("h2") is not None
+
+
+def operation_timeout(total: timedelta) -> Timeout:
+    """Build a per-operation timeout with the shared connect timeout."""
+    return Timeout(total.total_seconds(), connect=HTTP_CONNECT_TIMEOUT.total_seconds())
+
+
+DEFAULT_TIMEOUT = operation_timeout(HTTP_DEFAULT_TIMEOUT)
+
+
+class _BorrowedTransport(AsyncBaseTransport):
+    """Client-facing view of a shared transport that leaves the pool open on close."""
+
+    def __init__(self, transport: AsyncBaseTransport) -> None:
+        self._transport = transport
+
+    async def handle_async_request(self, request: Request) -> Response:
+        return await self._transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        """Keep the shared pool open; its owner closes it."""
+
+
+class SberHttpTransport:
+    """Connection pool shared by the auth and gateway clients.
+
+    Clients get a borrowed view through ``client_transport()``, so closing a
+    client keeps the pool and its warm TLS connections open for the others.
+    HTTP/2 is used when the ``h2`` package is installed unless disabled.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_connections: int = HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections: int = HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: timedelta = HTTP_KEEPALIVE_EXPIRY,
+        http2: bool | None = None,
+        ssl_context: ssl.SSLContext | None = None,
+    ) -> None:
+        self.http2 = http2_available() if http2 is None else http2
+        self._transport = AsyncHTTPTransport(
+            verify=ssl_context or get_ssl_context(),
+            http2=self.http2,
+            limits=Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry.total_seconds(),
+            ),
+        )
+
+    def client_transport(self) -> AsyncBaseTransport:
+        return _BorrowedTransport(self._transport)
+
+    async def async_close(self) -> None:
+        await self._transport.aclose()
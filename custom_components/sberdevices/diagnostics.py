@@ -0,0 +1,34 @@
+"""Diagnostics support for SberDevices."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+
+from .core.runtime import SberConfigEntry
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: SberConfigEntry) -> dict[str, Any]:
+    """Return coordinator state, gateway metrics and command round trips; the token is left out."""
+    coordinator = entry.runtime_data.coordinator
+    last_diff = coordinator.last_diff
+    return {
+        "options": dict(entry.options),
+        "coordinator": {
+            "last_update_success": coordinator.last_update_success,
+            "update_interval": coordinator.update_interval.total_seconds() if coordinator.update_interval else None,
+            "compact": coordinator.compact,
+            "devices": len(coordinator.data) if coordinator.data is not None else 0,
+            "last_diff": {
+                "added": len(last_diff.added),
+                "removed": len(last_diff.removed),
+                "changed": len(last_diff.changed),
+            },
+        },
+        "entities": coordinator.entity_index.as_dict(),
+        "metrics": coordinator.gateway_client.metrics.as_dict(),
+        "circuit_breaker": coordinator.gateway_client.circuit_breaker.as_dict(),
+        "commands": coordinator.commands.as_dict(),
+        "polling_engine": coordinator.polling_engine.as_dict() if coordinator.polling_engine is not None else None,
+    }
@@ -2,7 +2,12 @@
 
 from __future__ import annotations
 
+import asyncio
+import logging
 import math
+from collections.abc import Iterable, Mapping, Set
+from dataclasses import dataclass
+from functools import partial
 from typing import Any
 
 from homeassistant.components.light import (
@@ -16,144 +21,349 @@ from homeassistant.components.light import (
     LightEntity,
     LightEntityFeature,
 )
-from homeassistant.core import HomeAssistant
+from homeassistant.const import Platform
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.util.color import brightness_to_value, value_to_brightness
-from homeassistant.util.scaling import scale_ranged_value_to_int_range
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util.scaling import states_in_range
 
 from .const import (
     COLOR_TEMP_RANGES,
+    CONF_GROUP_LIGHTS,
     DEFAULT_COLOR_TEMP_RANGE,
+    GROUP_LIGHT_MIN_MEMBERS,
     H_RANGE,
-    LIGHT_TYPES,
     S_RANGE,
 )
 from .core.coordinator import SberDataUpdateCoordinator
+from .core.descriptors import DeviceDescriptors, platform_descriptors
 from .core.entity import SberEntity
 from .core.runtime import SberConfigEntry
-from .core.snapshot import DeviceState
+from .core.snapshot import DeviceAttribute, DeviceCache, DeviceGroup, DeviceRecord, DeviceState, merge_state_patches
 
+_LOGGER = logging.getLogger(__name__)
 
-def get_color_temp_range(device_type: str) -> tuple[int, int]:
-    return COLOR_TEMP_RANGES.get(device_type, DEFAULT_COLOR_TEMP_RANGE)
+# Commands are coalesced and rate limited by the gateway client.
+PARALLEL_UPDATES = 0
 
 
-async def async_setup_entry(
-    hass: HomeAssistant, entry: SberConfigEntry, async_add_entities: AddEntitiesCallback
-) -> None:
-    runtime_data = entry.runtime_data
-    async_add_entities(
-        [
-            SberLightEntity(
-                runtime_data.coordinator,
-                device["id"],
-                next(t for t in LIGHT_TYPES if t in device["image_set_type"]),
-            )
-            for device in runtime_data.coordinator.data.values()
-            if any(t in device["image_set_type"] for t in LIGHT_TYPES)
-        ]
-    )
+BRIGHTNESS_RANGE = (1, 255)
+PROFILE_ATTRIBUTES = ("light_mode", "light_brightness", "light_colour_temp", "light_colour", "light_scene")
 
 
-class SberLightEntity(SberEntity, LightEntity):
-    def __init__(self, coordinator: SberDataUpdateCoordinator, device_id: str, device_type: str) -> None:
-        super().__init__(coordinator, device_id)
+def get_color_temp_range(device_type: str) -> tuple[int, int]:
+    return COLOR_TEMP_RANGES.get(device_type, DEFAULT_COLOR_TEMP_RANGE)
+
 
-        self._real_color_temp_range = get_color_temp_range(device_type)
-        self._attr_min_color_temp_kelvin = self._real_color_temp_range[0]
-        self._attr_max_color_temp_kelvin = self._real_color_temp_range[1]
-
-        light_mode_values = self.get_attribute("light_mode")["enum_values"]["values"]
-        self._supports_brightness = self.has_attribute("light_brightness")
-        self._supports_color_temp = self.has_attribute("light_colour_temp")
-        self._supports_hs = "colour" in light_mode_values and self.has_attribute("light_colour")
-        self._supports_white_command = "white" in light_mode_values
-        self._supports_white_mode = "white" in light_mode_values and self._supports_hs and not self._supports_color_temp
-        self._scene_effect_values = self._enum_values("light_scene")
-        self._supports_music_effect = "music" in light_mode_values
-        self._supports_adaptive_effect = "adaptive" in light_mode_values
-        self._effect_values = self._build_effect_list()
+@dataclass(slots=True, frozen=True)
+class RangeScale:
+    """Linear map between a device range and a HA range.
+
+    Same results as ``homeassistant.util.scaling`` and the brightness helpers of
+    ``homeassistant.util.color``, with the offsets and state counts precomputed.
+    """
+
+    device_offset: float
+    ha_offset: float
+    device_states: float
+    ha_states: float
+
+    @classmethod
+    def between(cls, device_range: tuple[float, float], ha_range: tuple[float, float]) -> RangeScale:
+        return cls(device_range[0] - 1, ha_range[0] - 1, states_in_range(device_range), states_in_range(ha_range))
+
+    def to_ha(self, value: float) -> int:
+        return int((value - self.device_offset) * self.ha_states // self.device_states + self.ha_offset)
+
+    def to_device(self, value: float) -> int:
+        return int((value - self.ha_offset) * self.device_states // self.ha_states + self.device_offset)
+
+    def to_brightness(self, value: float) -> int:
+        """Like ``value_to_brightness``; the HA range must be ``BRIGHTNESS_RANGE``."""
+        brightness = (value - self.device_offset) * self.ha_states / self.device_states + self.ha_offset
+        return min(255, max(1, round(brightness)))
+
+    def from_brightness(self, brightness: float) -> float:
+        """Like ``brightness_to_value``; the HA range must be ``BRIGHTNESS_RANGE``."""
+        return (brightness - self.ha_offset) * self.device_states / self.ha_states + self.device_offset
+
+
+# Placeholder for scales of unsupported features, which are never used.
+IDENTITY_SCALE = RangeScale(0, 0, 1, 1)
+
+
+def _range(attribute: DeviceAttribute) -> tuple[int, int]:
+    value_range = attribute["int_values"]["range"]
+    return value_range["min"], value_range["max"]
+
+
+def _enum_values(attributes: Mapping[str, DeviceAttribute], key: str) -> list[str]:
+    attribute = attributes.get(key)
+    if attribute is None:
+        return []
+
+    enum_values = attribute.get("enum_values")
+    if not isinstance(enum_values, dict):
+        return []
+
+    values = enum_values.get("values")
+    if not isinstance(values, list):
+        return []
+
+    return [value for value in values if isinstance(value, str)]
+
+
+@dataclass(slots=True, frozen=True)
+class LightProfile:
+    """Capabilities and value scales shared by lights of one model and attribute set."""
+
+    supports_brightness: bool
+    supports_color_temp: bool
+    supports_hs: bool
+    supports_white_command: bool
+    supports_white_mode: bool
+    supports_music_effect: bool
+    supports_adaptive_effect: bool
+    scene_effect_values: tuple[str, ...]
+    effect_values: tuple[str, ...]
+    supported_color_modes: frozenset[ColorMode]
+    real_color_temp_range: tuple[int, int]
+    colour_value_min: int = 0
+    brightness_scale: RangeScale = IDENTITY_SCALE
+    color_temp_scale: RangeScale = IDENTITY_SCALE
+    hue_scale: RangeScale = IDENTITY_SCALE
+    saturation_scale: RangeScale = IDENTITY_SCALE
+    colour_value_scale: RangeScale = IDENTITY_SCALE
+
+    @classmethod
+    def from_attributes(cls, device_type: str, attributes: Mapping[str, DeviceAttribute]) -> LightProfile:
+        light_mode_values = attributes["light_mode"]["enum_values"]["values"]
+        supports_brightness = "light_brightness" in attributes
+        supports_color_temp = "light_colour_temp" in attributes
+        supports_hs = "colour" in light_mode_values and "light_colour" in attributes
+        supports_white_mode = "white" in light_mode_values and supports_hs and not supports_color_temp
+        supports_music_effect = "music" in light_mode_values
+        supports_adaptive_effect = "adaptive" in light_mode_values
+        scene_effect_values = tuple(_enum_values(attributes, "light_scene"))
+        effect_values = scene_effect_values
+        if supports_music_effect:
+            effect_values += ("music",)
+        if supports_adaptive_effect:
+            effect_values += ("adaptive",)
 
         # Normalize raw device capabilities into a HA-valid supported_color_modes set.
         supported_color_modes: set[ColorMode] = set()
-        if self._supports_hs:
+        if supports_hs:
             supported_color_modes.add(ColorMode.HS)
-        if self._supports_color_temp:
+        if supports_color_temp:
             supported_color_modes.add(ColorMode.COLOR_TEMP)
-        elif self._supports_white_mode:
+        elif supports_white_mode:
             supported_color_modes.add(ColorMode.WHITE)
-        elif self._supports_brightness:
+        elif supports_brightness:
             supported_color_modes.add(ColorMode.BRIGHTNESS)
         else:
             supported_color_modes.add(ColorMode.ONOFF)
-        self._attr_supported_color_modes = supported_color_modes
-        if self._effect_values:
-            self._attr_supported_features = LightEntityFeature.EFFECT
-            self._attr_effect_list = self._effect_values
-
-        if self._supports_brightness:
-            br = self.get_attribute("light_brightness")["int_values"]["range"]
-            self._brightness_range = (br["min"], br["max"])
-
-        if self._supports_color_temp:
-            ct = self.get_attribute("light_colour_temp")["int_values"]["range"]
-            self._color_temp_range = (ct["min"], ct["max"])
-
-        if self._supports_hs:
-            cv = self.get_attribute("light_colour")["color_values"]
-            self._color_range: dict[str, tuple[int, int]] = {
-                "h": (cv["h"]["min"], cv["h"]["max"]),
-                "s": (cv["s"]["min"], cv["s"]["max"]),
-                "v": (cv["v"]["min"], cv["v"]["max"]),
-            }
 
-        self._update_attrs()
+        real_color_temp_range = get_color_temp_range(device_type)
+        scales: dict[str, Any] = {}
+        if supports_brightness:
+            scales["brightness_scale"] = RangeScale.between(_range(attributes["light_brightness"]), BRIGHTNESS_RANGE)
+        if supports_color_temp:
+            scales["color_temp_scale"] = RangeScale.between(
+                _range(attributes["light_colour_temp"]), real_color_temp_range
+            )
+        if supports_hs:
+            cv = attributes["light_colour"]["color_values"]
+            scales["colour_value_min"] = cv["v"]["min"]
+            scales["hue_scale"] = RangeScale.between((cv["h"]["min"], cv["h"]["max"]), H_RANGE)
+            scales["saturation_scale"] = RangeScale.between((cv["s"]["min"], cv["s"]["max"]), S_RANGE)
+            scales["colour_value_scale"] = RangeScale.between((cv["v"]["min"], cv["v"]["max"]), BRIGHTNESS_RANGE)
+
+        return cls(
+            supports_brightness=supports_brightness,
+            supports_color_temp=supports_color_temp,
+            supports_hs=supports_hs,
+            supports_white_command="white" in light_mode_values,
+            supports_white_mode=supports_white_mode,
+            supports_music_effect=supports_music_effect,
+            supports_adaptive_effect=supports_adaptive_effect,
+            scene_effect_values=scene_effect_values,
+            effect_values=effect_values,
+            supported_color_modes=frozenset(supported_color_modes),
+            real_color_temp_range=real_color_temp_range,
+            **scales,
+        )
 
-    def _enum_values(self, key: str) -> list[str]:
-        if not self.has_attribute(key):
-            return []
 
-        enum_values = self.get_attribute(key).get("enum_values")
-        if not isinstance(enum_values, dict):
-            return []
+class LightProfiles:
+    """Light profiles of one config entry, by device type, model and light attributes."""
 
-        values = enum_values.get("values")
-        if not isinstance(values, list):
-            return []
+    def __init__(self) -> None:
+        self._profiles: dict[tuple[str, str], list[tuple[list[DeviceAttribute | None], LightProfile]]] = {}
 
-        return [value for value in values if isinstance(value, str)]
+    def get(self, device_type: str, device: DeviceRecord) -> LightProfile:
+        """Return the shared profile for the device's type, model and light attributes."""
+        attributes = device.attributes
+        signature = [attributes.get(key) for key in PROFILE_ATTRIBUTES]
+        profiles = self._profiles.setdefault((device_type, device.model), [])
+        for profile_signature, profile in profiles:
+            if profile_signature == signature:
+                return profile
 
-    def _build_effect_list(self) -> list[str]:
-        effect_values = [*self._scene_effect_values]
-        if self._supports_music_effect:
-            effect_values.append("music")
-        if self._supports_adaptive_effect:
-            effect_values.append("adaptive")
-        return effect_values
+        profile = LightProfile.from_attributes(device_type, attributes)
+        profiles.append((signature, profile))
+        return profile
+
+
+async def async_setup_entry(
+    hass: HomeAssistant, entry: SberConfigEntry, async_add_entities: AddEntitiesCallback
+) -> None:
+    coordinator = entry.runtime_data.coordinator
+    index = coordinator.entity_index.platform(Platform.LIGHT)
+    # Light entities by device id, for group lights to read and command.
+    lights: dict[str, SberLightEntity] = {}
+    # Freed with the entry, so reloads and removed entries do not keep their profiles.
+    profiles = LightProfiles()
+
+    @callback
+    def async_add_devices(descriptors: DeviceDescriptors) -> None:
+        new_lights = {
+            device_id: SberLightEntity(coordinator, device_id, descriptor.variant, profiles)
+            for device_id, descriptor in platform_descriptors(descriptors, Platform.LIGHT)
+        }
+        for device_id, light in new_lights.items():
+            lights[device_id] = light
+            light.async_on_remove(partial(_forget_light, lights, device_id, light))
+        async_add_entities(new_lights.values())
+
+    async_add_devices(index)
+    entry.async_on_unload(coordinator.async_add_new_devices_listener(async_add_devices))
+    if entry.options.get(CONF_GROUP_LIGHTS, False):
+        group_lights = SberGroupLights(hass, entry, lights, async_add_entities)
+        group_lights.async_update()
+        entry.async_on_unload(coordinator.async_add_listener(group_lights.async_update))
+
+
+def _forget_light(lights: dict[str, SberLightEntity], device_id: str, light: SberLightEntity) -> None:
+    # A device that came back may already have a new entity.
+    if lights.get(device_id) is light:
+        del lights[device_id]
+
+
+def _group_members(devices: DeviceCache, device_ids: Iterable[str]) -> dict[str, set[str]]:
+    """Return the lights of every named group with a gateway id, including the lights of its subgroups."""
+    members: dict[str, set[str]] = {}
+    for device_id in device_ids:
+        group_id = devices.device_groups.get(device_id)
+        while group_id is not None and (group := devices.groups.get(group_id)) is not None:
+            if group.name and group.has_gateway_id:
+                members.setdefault(group_id, set()).add(device_id)
+            group_id = group.parent_id
+    return members
+
+
+class SberGroupLights:
+    """Group light entities of an entry, following the groups and lights of the device tree.
+
+    Memberships are worked out again only when the coordinator holds a new
+    snapshot, which it does only when the tree changed. A group has an
+    entity while it has at least ``GROUP_LIGHT_MIN_MEMBERS`` lights. Groups
+    without a gateway id are skipped, since their ids follow their position
+    in the tree and reordering rooms would move entities between them.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: SberConfigEntry,
+        lights: Mapping[str, SberLightEntity],
+        async_add_entities: AddEntitiesCallback,
+    ) -> None:
+        self._hass = hass
+        self._entry = entry
+        self._coordinator = entry.runtime_data.coordinator
+        self._lights = lights
+        self._async_add_entities = async_add_entities
+        self._data: DeviceCache | None = None
+        self.groups: dict[str, SberGroupLightEntity] = {}
+
+    @callback
+    def async_update(self) -> None:
+        data = self._coordinator.data
+        if data is self._data:
+            return
+
+        self._data = data
+        members = _group_members(data, [device_id for device_id in self._lights if device_id in data])
+        for group_id, group in list(self.groups.items()):
+            member_ids = members.get(group_id, set())
+            if len(member_ids) >= GROUP_LIGHT_MIN_MEMBERS:
+                group.async_set_members(member_ids)
+            else:
+                del self.groups[group_id]
+                self._async_remove_group(group)
+
+        new_groups: list[SberGroupLightEntity] = []
+        for group_id, member_ids in members.items():
+            if group_id not in self.groups and len(member_ids) >= GROUP_LIGHT_MIN_MEMBERS:
+                group = SberGroupLightEntity(
+                    self._coordinator, self._entry, data.groups[group_id], self._lights, member_ids
+                )
+                self.groups[group_id] = group
+                new_groups.append(group)
+        if new_groups:
+            self._async_add_entities(new_groups)
+
+    @callback
+    def _async_remove_group(self, group: SberGroupLightEntity) -> None:
+        _LOGGER.debug("Removing group light %s", group.entity_id)
+        if group.registry_entry is not None:
+            # Home Assistant removes the entity along with its registry entry.
+            er.async_get(self._hass).async_remove(group.entity_id)
+        elif group.hass is not None:
+            self._hass.async_create_task(group.async_remove(force_remove=True))
+
+
+class SberLightEntity(SberEntity, LightEntity):
+    def __init__(
+        self, coordinator: SberDataUpdateCoordinator, device_id: str, device_type: str, profiles: LightProfiles
+    ) -> None:
+        super().__init__(coordinator, device_id)
+
+        self._profile = profile = profiles.get(device_type, self.device)
+        self._attr_min_color_temp_kelvin = profile.real_color_temp_range[0]
+        self._attr_max_color_temp_kelvin = profile.real_color_temp_range[1]
+        self._attr_supported_color_modes = set(profile.supported_color_modes)
+        if profile.effect_values:
+            self._attr_supported_features = LightEntityFeature.EFFECT
+            self._attr_effect_list = list(profile.effect_values)
+
+        self._update_attrs()
 
     def _is_effect_mode(self, mode: str) -> bool:
         return (
             mode == "scene"
-            or (mode == "music" and self._supports_music_effect)
-            or (mode == "adaptive" and self._supports_adaptive_effect)
+            or (mode == "music" and self._profile.supports_music_effect)
+            or (mode == "adaptive" and self._profile.supports_adaptive_effect)
         )
 
     def _current_effect(self) -> str:
-        mode = self.get_desired_state("light_mode")["enum_value"]
+        mode = self.get_desired_value("light_mode")
         if mode == "scene":
-            scene = self.get_desired_state("light_scene").get("enum_value")
+            scene = self.get_desired_value("light_scene")
             if isinstance(scene, str) and scene:
                 return scene
-        elif mode == "music" and self._supports_music_effect:
+        elif mode == "music" and self._profile.supports_music_effect:
             return "music"
-        elif mode == "adaptive" and self._supports_adaptive_effect:
+        elif mode == "adaptive" and self._profile.supports_adaptive_effect:
             return "adaptive"
         return EFFECT_OFF
 
     def _default_non_effect_mode(self) -> str | None:
-        if self._supports_white_command:
+        if self._profile.supports_white_command:
             return "white"
-        if self._supports_hs:
+        if self._profile.supports_hs:
             return "colour"
         return None
 
@@ -176,63 +386,61 @@ class SberLightEntity(SberEntity, LightEntity):
         return effect is not None and effect != EFFECT_OFF
 
     def _current_ha_color_mode(self) -> ColorMode:
-        mode = self.get_desired_state("light_mode")["enum_value"]
-        if self._is_effect_mode(mode):
-            return ColorMode.BRIGHTNESS if self._supports_brightness else ColorMode.ONOFF
+        mode = self.get_desired_value("light_mode")
+        if isinstance(mode, str) and self._is_effect_mode(mode):
+            return ColorMode.BRIGHTNESS if self._profile.supports_brightness else ColorMode.ONOFF
 
         match mode:
             case "white":
-                if self._supports_color_temp:
+                if self._profile.supports_color_temp:
                     return ColorMode.COLOR_TEMP
-                if self._supports_white_mode:
+                if self._profile.supports_white_mode:
                     return ColorMode.WHITE
-                if self._supports_brightness:
+                if self._profile.supports_brightness:
                     return ColorMode.BRIGHTNESS
                 return ColorMode.ONOFF
-            case "colour" if self._supports_hs:
+            case "colour" if self._profile.supports_hs:
                 return ColorMode.HS
             case _:
-                return ColorMode.BRIGHTNESS if self._supports_brightness else ColorMode.ONOFF
+                return ColorMode.BRIGHTNESS if self._profile.supports_brightness else ColorMode.ONOFF
 
     def _update_brightness_attr(self) -> None:
-        if not self._supports_brightness:
+        if not self._profile.supports_brightness:
             return
 
         if self._attr_color_mode == ColorMode.HS:
             colour = self._get_color_value()
             if colour is not None and "v" in colour:
-                self._attr_brightness = value_to_brightness(self._color_range["v"], colour["v"])
+                self._attr_brightness = self._profile.colour_value_scale.to_brightness(colour["v"])
                 return
 
-        brightness = int(self.get_desired_state("light_brightness")["integer_value"])
-        self._attr_brightness = value_to_brightness(self._brightness_range, brightness)
+        brightness = self.get_desired_value("light_brightness")
+        self._attr_brightness = self._profile.brightness_scale.to_brightness(brightness)
 
     def _update_color_temp_attr(self) -> None:
-        if not self._supports_color_temp:
+        if not self._profile.supports_color_temp:
             return
 
-        ct = int(self.get_desired_state("light_colour_temp")["integer_value"])
-        self._attr_color_temp_kelvin = scale_ranged_value_to_int_range(
-            self._color_temp_range, self._real_color_temp_range, ct
-        )
+        ct = self.get_desired_value("light_colour_temp")
+        self._attr_color_temp_kelvin = self._profile.color_temp_scale.to_ha(ct)
 
     def _update_hs_attr(self) -> None:
-        if not self._supports_hs:
+        if not self._profile.supports_hs:
             return
 
         self._attr_hs_color = self._compute_hs_color()
 
     def _update_attrs(self) -> None:
-        self._attr_is_on = self.get_desired_state("on_off")["bool_value"]
+        self._attr_is_on = self.get_desired_value("on_off")
         self._attr_color_mode = self._current_ha_color_mode()
-        if self._effect_values:
+        if self._profile.effect_values:
             self._attr_effect = self._current_effect()
         self._update_brightness_attr()
         self._update_color_temp_attr()
         self._update_hs_attr()
 
     def _get_color_value(self) -> dict[str, Any] | None:
-        colour = self.get_desired_state("light_colour").get("color_value")
+        colour = self.get_desired_value("light_colour")
         if not isinstance(colour, dict):
             return None
         return colour
@@ -242,18 +450,7 @@ class SberLightEntity(SberEntity, LightEntity):
         if colour is None or "h" not in colour or "s" not in colour:
             return None
 
-        return (
-            scale_ranged_value_to_int_range(
-                self._color_range["h"],
-                H_RANGE,
-                colour["h"],
-            ),
-            scale_ranged_value_to_int_range(
-                self._color_range["s"],
-                S_RANGE,
-                colour["s"],
-            ),
-        )
+        return self._profile.hue_scale.to_ha(colour["h"]), self._profile.saturation_scale.to_ha(colour["s"])
 
     def _current_or_fallback_hs_color(self) -> tuple[float, float]:
         return self.hs_color or self._compute_hs_color() or (0.0, 0.0)
@@ -264,9 +461,9 @@ class SberLightEntity(SberEntity, LightEntity):
             return colour["v"]
 
         if self.brightness is not None:
-            return math.ceil(brightness_to_value(self._color_range["v"], self.brightness))
+            return math.ceil(self._profile.colour_value_scale.from_brightness(self.brightness))
 
-        return self._color_range["v"][0]
+        return self._profile.colour_value_min
 
     def _light_mode_state(self, mode: str) -> dict[str, Any]:
         return {"key": "light_mode", "enum_value": mode}
@@ -274,7 +471,7 @@ class SberLightEntity(SberEntity, LightEntity):
     def _light_brightness_state(self, brightness: int) -> dict[str, Any]:
         return {
             "key": "light_brightness",
-            "integer_value": math.ceil(brightness_to_value(self._brightness_range, brightness)),
+            "integer_value": math.ceil(self._profile.brightness_scale.from_brightness(brightness)),
         }
 
     def _light_colour_state(self, hs_color: tuple[float, float], value_brightness: int) -> dict[str, Any]:
@@ -282,16 +479,8 @@ class SberLightEntity(SberEntity, LightEntity):
         return {
             "key": "light_colour",
             "color_value": {
-                "h": scale_ranged_value_to_int_range(
-                    H_RANGE,
-                    self._color_range["h"],
-                    h,
-                ),
-                "s": scale_ranged_value_to_int_range(
-                    S_RANGE,
-                    self._color_range["s"],
-                    s,
-                ),
+                "h": self._profile.hue_scale.to_device(h),
+                "s": self._profile.saturation_scale.to_device(s),
                 "v": value_brightness,
             },
         }
@@ -303,26 +492,17 @@ class SberLightEntity(SberEntity, LightEntity):
         return brightness
 
     def _requested_color_temp(self, kelvin: int) -> int:
-        color_temp = scale_ranged_value_to_int_range(
-            self._real_color_temp_range,
-            self._color_temp_range,
-            kelvin,
-        )
+        color_temp = self._profile.color_temp_scale.to_device(kelvin)
         return max(color_temp, 0)
 
     def _finalize_state_patch(self, states: list[DeviceState]) -> list[DeviceState]:
-        states_by_key: dict[str, DeviceState] = {}
-        for state in states:
-            key = state["key"]
-            states_by_key.pop(key, None)
-            states_by_key[key] = state
-        return list(states_by_key.values())
+        return merge_state_patches(states)
 
     def _queue_power_on(self, states: list[DeviceState]) -> None:
         states.append({"key": "on_off", "bool_value": True})
 
     def _queue_effect_request(self, states: list[DeviceState], kwargs: dict[str, Any]) -> None:
-        if ATTR_EFFECT not in kwargs or not self._effect_values:
+        if ATTR_EFFECT not in kwargs or not self._profile.effect_values:
             return
 
         effect = kwargs[ATTR_EFFECT]
@@ -334,7 +514,7 @@ class SberLightEntity(SberEntity, LightEntity):
                 states.append(self._light_mode_state(default_mode))
             return
 
-        if effect in self._scene_effect_values:
+        if effect in self._profile.scene_effect_values:
             states.extend(
                 (
                     self._light_mode_state("scene"),
@@ -343,11 +523,11 @@ class SberLightEntity(SberEntity, LightEntity):
             )
             return
 
-        if effect == "music" and self._supports_music_effect:
+        if effect == "music" and self._profile.supports_music_effect:
             states.append(self._light_mode_state("music"))
             return
 
-        if effect == "adaptive" and self._supports_adaptive_effect:
+        if effect == "adaptive" and self._profile.supports_adaptive_effect:
             states.append(self._light_mode_state("adaptive"))
 
     def _queue_colour_brightness_request(self, states: list[DeviceState], kwargs: dict[str, Any]) -> None:
@@ -367,7 +547,7 @@ class SberLightEntity(SberEntity, LightEntity):
                 self._light_brightness_state(brightness),
                 self._light_colour_state(
                     self._current_or_fallback_hs_color(),
-                    math.ceil(brightness_to_value(self._color_range["v"], brightness)),
+                    math.ceil(self._profile.colour_value_scale.from_brightness(brightness)),
                 ),
             )
         )
@@ -385,7 +565,7 @@ class SberLightEntity(SberEntity, LightEntity):
             states.append(self._light_brightness_state(brightness))
             return
 
-        if (self.color_mode == ColorMode.HS and ATTR_WHITE not in kwargs) or not self._supports_white_command:
+        if (self.color_mode == ColorMode.HS and ATTR_WHITE not in kwargs) or not self._profile.supports_white_command:
             return
 
         states.extend(
@@ -399,7 +579,7 @@ class SberLightEntity(SberEntity, LightEntity):
         if (
             self._has_active_effect_request(kwargs)
             or ATTR_COLOR_TEMP_KELVIN not in kwargs
-            or not self._supports_color_temp
+            or not self._profile.supports_color_temp
         ):
             return
 
@@ -414,7 +594,7 @@ class SberLightEntity(SberEntity, LightEntity):
         )
 
     def _queue_hs_color_request(self, states: list[DeviceState], kwargs: dict[str, Any]) -> None:
-        if self._has_active_effect_request(kwargs) or ATTR_HS_COLOR not in kwargs or not self._supports_hs:
+        if self._has_active_effect_request(kwargs) or ATTR_HS_COLOR not in kwargs or not self._profile.supports_hs:
             return
 
         hs_color = kwargs[ATTR_HS_COLOR]
@@ -426,7 +606,7 @@ class SberLightEntity(SberEntity, LightEntity):
             )
         )
 
-    async def async_turn_on(self, **kwargs: Any) -> None:
+    def _turn_on_states(self, kwargs: dict[str, Any]) -> list[DeviceState]:
         states: list[DeviceState] = []
         self._queue_power_on(states)
         self._queue_effect_request(states, kwargs)
@@ -434,8 +614,193 @@ class SberLightEntity(SberEntity, LightEntity):
         self._queue_white_brightness_request(states, kwargs)
         self._queue_color_temperature_request(states, kwargs)
         self._queue_hs_color_request(states, kwargs)
+        return self._finalize_state_patch(states)
 
-        await self.async_set_states(self._finalize_state_patch(states))
+    async def async_turn_on(self, **kwargs: Any) -> None:
+        await self.async_set_states(self._turn_on_states(kwargs))
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         await self.async_set_on_off(False)
+
+
+class LightGroupState:
+    """On/off state and brightness of a light group, updated one member at a time.
+
+    Brightness is the mean over members that are on and report one; a running
+    total keeps each member update constant time.
+    """
+
+    __slots__ = ("_brightness", "_brightness_total", "available", "on")
+
+    def __init__(self) -> None:
+        self.available: set[str] = set()
+        self.on: set[str] = set()
+        self._brightness: dict[str, int] = {}
+        self._brightness_total = 0
+
+    def update(self, member_id: str, available: bool, is_on: bool, brightness: int | None) -> None:
+        self.remove(member_id)
+        if not available:
+            return
+
+        self.available.add(member_id)
+        if not is_on:
+            return
+
+        self.on.add(member_id)
+        if brightness is not None:
+            self._brightness[member_id] = brightness
+            self._brightness_total += brightness
+
+    def remove(self, member_id: str) -> None:
+        self.available.discard(member_id)
+        self.on.discard(member_id)
+        if (brightness := self._brightness.pop(member_id, None)) is not None:
+            self._brightness_total -= brightness
+
+    @property
+    def brightness(self) -> int | None:
+        if not self._brightness:
+            return None
+        return round(self._brightness_total / len(self._brightness))
+
+
+class SberGroupLightEntity(CoordinatorEntity[SberDataUpdateCoordinator], LightEntity):
+    """Light of a group or room of the device tree, switching all of its lights.
+
+    The gateway has no group endpoint, so a command becomes one state write
+    per available member: the coordinator patches them all with a single
+    update and the gateway client's write queue sends them together, within
+    its concurrency limit. Member updates only mark the member dirty; dirty
+    members are folded into the group state once per event loop iteration.
+    """
+
+    def __init__(
+        self,
+        coordinator: SberDataUpdateCoordinator,
+        entry: SberConfigEntry,
+        group: DeviceGroup,
+        lights: Mapping[str, SberLightEntity],
+        member_ids: Set[str],
+    ) -> None:
+        super().__init__(coordinator)
+        self._lights = lights
+        self._members: set[str] = set()
+        self._dirty: set[str] = set()
+        self._state = LightGroupState()
+        self._member_listeners: dict[str, CALLBACK_TYPE] = {}
+        self._flush_handle: asyncio.Handle | None = None
+        self._written: tuple[bool, bool, int | None] | None = None
+        self._attr_unique_id = f"{entry.entry_id}_group_{group.id}"
+        self._attr_name = group.name
+        self._attr_color_mode = ColorMode.ONOFF
+        self._attr_supported_color_modes = {ColorMode.ONOFF}
+        self.async_set_members(member_ids)
+        self._fold_dirty_members()
+
+    @property
+    def available(self) -> bool:
+        return super().available and bool(self._state.available)
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        for member_id in self._members:
+            self._listen_to_member(member_id)
+
+    async def async_will_remove_from_hass(self) -> None:
+        await super().async_will_remove_from_hass()
+        for remove_listener in self._member_listeners.values():
+            remove_listener()
+        self._member_listeners.clear()
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+    @callback
+    def async_set_members(self, member_ids: Set[str]) -> None:
+        for member_id in self._members - member_ids:
+            self._members.discard(member_id)
+            if (remove_listener := self._member_listeners.pop(member_id, None)) is not None:
+                remove_listener()
+            self._async_member_updated(member_id)
+        for member_id in member_ids - self._members:
+            self._members.add(member_id)
+            if self.hass is not None:
+                self._listen_to_member(member_id)
+            self._async_member_updated(member_id)
+
+        supports_brightness = any(
+            (light := self._lights.get(member_id)) is not None and light._profile.supports_brightness
+            for member_id in self._members
+        )
+        self._attr_color_mode = ColorMode.BRIGHTNESS if supports_brightness else ColorMode.ONOFF
+        self._attr_supported_color_modes = {self._attr_color_mode}
+
+    def _listen_to_member(self, member_id: str) -> None:
+        self._member_listeners[member_id] = self.coordinator.async_add_listener(
+            partial(self._async_member_updated, member_id), member_id
+        )
+
+    @callback
+    def _async_member_updated(self, member_id: str) -> None:
+        self._dirty.add(member_id)
+        self._async_schedule_flush()
+
+    @callback
+    def _async_schedule_flush(self) -> None:
+        if self.hass is not None and self._flush_handle is None:
+            self._flush_handle = self.hass.loop.call_soon(self._async_flush)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        # Called on every coordinator update; members are notified separately.
+        if self._written is None or self._written[0] != self.available:
+            self._async_schedule_flush()
+
+    @callback
+    def _async_flush(self) -> None:
+        self._flush_handle = None
+        self._fold_dirty_members()
+        state = (self.available, bool(self._attr_is_on), self._attr_brightness)
+        if state != self._written:
+            self._written = state
+            self.async_write_ha_state()
+
+    def _fold_dirty_members(self) -> None:
+        # Member light entities have already handled the update by the time this runs.
+        for member_id in self._dirty:
+            light = self._lights.get(member_id)
+            if light is None or member_id not in self._members or member_id not in self.coordinator.data:
+                self._state.remove(member_id)
+            else:
+                self._state.update(member_id, light.available, bool(light.is_on), light.brightness)
+        self._dirty.clear()
+        self._attr_is_on = bool(self._state.on)
+        self._attr_brightness = self._state.brightness if self._attr_color_mode == ColorMode.BRIGHTNESS else None
+
+    def _command_members(self) -> dict[str, SberLightEntity]:
+        # Offline members are left out so that they cannot fail the whole command.
+        self._fold_dirty_members()
+        return {
+            member_id: light
+            for member_id in self._state.available
+            if (light := self._lights.get(member_id)) is not None
+        }
+
+    async def async_turn_on(self, **kwargs: Any) -> None:
+        brightness_kwargs = {ATTR_BRIGHTNESS: kwargs[ATTR_BRIGHTNESS]} if ATTR_BRIGHTNESS in kwargs else {}
+        await self._async_set_members_states(
+            {
+                member_id: light._turn_on_states(brightness_kwargs if light._profile.supports_brightness else {})
+                for member_id, light in self._command_members().items()
+            }
+        )
+
+    async def async_turn_off(self, **kwargs: Any) -> None:
+        await self._async_set_members_states(
+            {member_id: [{"key": "on_off", "bool_value": False}] for member_id in self._command_members()}
+        )
+
+    async def _async_set_members_states(self, states: dict[str, list[DeviceState]]) -> None:
+        if states:
+            await self.coordinator.async_set_devices_state(states)
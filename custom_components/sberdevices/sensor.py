@@ -0,0 +1,286 @@
+"""Support for SberDevices sensors."""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from decimal import Decimal
+
+from homeassistant.components.sensor import (
+    RestoreSensor,
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.const import (
+    EntityCategory,
+    Platform,
+    UnitOfElectricCurrent,
+    UnitOfElectricPotential,
+    UnitOfEnergy,
+    UnitOfPower,
+    UnitOfTime,
+)
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.typing import StateType
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DOMAIN, ENDPOINT_DEVICE_STATE, ENDPOINT_DEVICE_TREE
+from .core.coordinator import SberDataUpdateCoordinator
+from .core.descriptors import DeviceDescriptors, platform_descriptors
+from .core.entity import SberEntity
+from .core.metrics import PerformanceMetrics
+from .core.runtime import SberConfigEntry
+
+PARALLEL_UPDATES = 0
+
+
+@dataclass(frozen=True, kw_only=True)
+class SberMetricSensorEntityDescription(SensorEntityDescription):
+    """Sensor reading one value from the gateway performance metrics."""
+
+    value_fn: Callable[[PerformanceMetrics], StateType]
+
+
+def _latency_description(
+    key: str, value_fn: Callable[[PerformanceMetrics], StateType]
+) -> SberMetricSensorEntityDescription:
+    return SberMetricSensorEntityDescription(
+        key=key,
+        translation_key=key,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        suggested_display_precision=0,
+        value_fn=value_fn,
+    )
+
+
+METRIC_SENSORS: tuple[SberMetricSensorEntityDescription, ...] = (
+    _latency_description("device_tree_latency", lambda m: m.latency_percentile(ENDPOINT_DEVICE_TREE, 0.95)),
+    _latency_description("state_write_latency", lambda m: m.latency_percentile(ENDPOINT_DEVICE_STATE, 0.95)),
+    _latency_description("processing_time", lambda m: m.stage_percentile("processing", 0.95)),
+    SberMetricSensorEntityDescription(
+        key="gateway_errors",
+        translation_key="gateway_errors",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda m: m.total_errors,
+    ),
+    SberMetricSensorEntityDescription(
+        key="gateway_retries",
+        translation_key="gateway_retries",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda m: m.total_retries,
+    ),
+)
+
+
+@dataclass(frozen=True, kw_only=True)
+class SberStateSensorEntityDescription(SensorEntityDescription):
+    """Numeric reported state; ``key`` is the state key unless the sensor derives its value."""
+
+    threshold: float
+    convert_fn: Callable[[int | float], float] = float
+
+
+def _current(value: int | float) -> float:
+    # Sockets report INTEGER current in mA and FLOAT current in A; decoding keeps the two types apart.
+    return value / 1000 if isinstance(value, int) else value
+
+
+SOCKET_SENSORS: tuple[SberStateSensorEntityDescription, ...] = (
+    SberStateSensorEntityDescription(
+        key="cur_power",
+        device_class=SensorDeviceClass.POWER,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfPower.WATT,
+        suggested_display_precision=0,
+        threshold=2.0,
+    ),
+    SberStateSensorEntityDescription(
+        key="cur_voltage",
+        device_class=SensorDeviceClass.VOLTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfElectricPotential.VOLT,
+        suggested_display_precision=0,
+        threshold=2.0,
+    ),
+    SberStateSensorEntityDescription(
+        key="cur_current",
+        device_class=SensorDeviceClass.CURRENT,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfElectricCurrent.AMPERE,
+        suggested_display_precision=2,
+        threshold=0.02,
+        convert_fn=_current,
+    ),
+)
+
+# Descriptions by reported state key; a device rule for the key is enough to add a sensor type.
+STATE_SENSORS: dict[str, SberStateSensorEntityDescription] = {
+    description.key: description for description in SOCKET_SENSORS
+}
+
+SOCKET_ENERGY_SENSOR = SberStateSensorEntityDescription(
+    key="energy",
+    device_class=SensorDeviceClass.ENERGY,
+    state_class=SensorStateClass.TOTAL_INCREASING,
+    native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+    suggested_display_precision=2,
+    threshold=0.01,
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant, entry: SberConfigEntry, async_add_entities: AddEntitiesCallback
+) -> None:
+    coordinator = entry.runtime_data.coordinator
+    entities: list[SensorEntity] = [
+        SberMetricSensorEntity(coordinator, entry, description) for description in METRIC_SENSORS
+    ]
+    index = coordinator.entity_index.platform(Platform.SENSOR)
+
+    @callback
+    def async_add_devices(descriptors: DeviceDescriptors) -> None:
+        async_add_entities(
+            _state_sensor(coordinator, device_id, descriptor.key)
+            for device_id, descriptor in platform_descriptors(descriptors, Platform.SENSOR)
+        )
+
+    async_add_entities(entities)
+    async_add_devices(index)
+    entry.async_on_unload(coordinator.async_add_new_devices_listener(async_add_devices))
+
+
+def _state_sensor(coordinator: SberDataUpdateCoordinator, device_id: str, key: str) -> SberStateSensorEntity:
+    if key == SOCKET_ENERGY_SENSOR.key:
+        return SberSocketEnergySensorEntity(coordinator, device_id, SOCKET_ENERGY_SENSOR)
+    return SberStateSensorEntity(coordinator, device_id, STATE_SENSORS[key])
+
+
+class SberMetricSensorEntity(CoordinatorEntity[SberDataUpdateCoordinator], SensorEntity):
+    """Gateway performance sensor, disabled by default.
+
+    Latency sensors report the 95th percentile of recent samples and refresh
+    with every coordinator update.
+    """
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_has_entity_name = True
+
+    def __init__(
+        self,
+        coordinator: SberDataUpdateCoordinator,
+        entry: SberConfigEntry,
+        description: SberMetricSensorEntityDescription,
+    ) -> None:
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._value_fn = description.value_fn
+        self._attr_unique_id = f"{entry.entry_id}_{description.key}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, entry.entry_id)},
+            name="SberDevices gateway",
+            entry_type=DeviceEntryType.SERVICE,
+        )
+        self._attr_native_value = self._value_fn(coordinator.gateway_client.metrics)
+
+    @property
+    def available(self) -> bool:
+        # Metrics stay meaningful while the gateway is failing.
+        return True
+
+    def _handle_coordinator_update(self) -> None:
+        self._attr_native_value = self._value_fn(self.coordinator.gateway_client.metrics)
+        super()._handle_coordinator_update()
+
+
+class SberStateSensorEntity(SberEntity, SensorEntity):
+    """Numeric reported state of a device, such as a socket's power meter.
+
+    The state is written only when the reading moves by at least the
+    description's ``threshold`` from the last written value, or when
+    availability changes, so meter noise does not reach the recorder.
+    """
+
+    _attr_has_entity_name = True
+
+    def __init__(
+        self,
+        coordinator: SberDataUpdateCoordinator,
+        device_id: str,
+        description: SberStateSensorEntityDescription,
+    ) -> None:
+        self.entity_description = description
+        self._description = description
+        # Numeric twin of _attr_native_value, compared against the threshold.
+        self._value: float | None = None
+        self._written: tuple[bool, float | None] | None = None
+        super().__init__(coordinator, device_id)
+        self._attr_unique_id = f"{device_id}_{description.key}"
+        self._update_attrs()
+
+    def _set_value(self, value: float | None) -> None:
+        self._value = self._attr_native_value = value
+
+    def _update_attrs(self) -> None:
+        value = self.get_reported_number(self._description.key)
+        self._set_value(None if value is None else self._description.convert_fn(value))
+
+    def _handle_coordinator_update(self) -> None:
+        if self._device_id in self.coordinator.data:
+            self._update_attrs()
+        state = (self.available, self._value)
+        if self._written is not None and not self._changed_significantly(self._written, state):
+            return
+        self._written = state
+        self.async_write_ha_state()
+
+    def _changed_significantly(self, written: tuple[bool, float | None], state: tuple[bool, float | None]) -> bool:
+        (was_available, old), (available, new) = written, state
+        if was_available != available or old is None or new is None:
+            return written != state
+        return abs(new - old) >= self._description.threshold
+
+
+class SberSocketEnergySensorEntity(SberStateSensorEntity, RestoreSensor):
+    """Energy in kWh integrated from the socket's reported power.
+
+    Reported power is a step function that only changes when the device
+    reports a new value, so each reading is held until the next one. Time
+    while the socket or the gateway is unavailable is not counted. The
+    total is restored across restarts.
+    """
+
+    def __init__(
+        self,
+        coordinator: SberDataUpdateCoordinator,
+        device_id: str,
+        description: SberStateSensorEntityDescription,
+    ) -> None:
+        self._energy = 0.0
+        self._power: float | None = None
+        self._sampled_at = 0.0
+        super().__init__(coordinator, device_id, description)
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        last = await self.async_get_last_sensor_data()
+        if last is not None and isinstance(last.native_value, int | float | Decimal):
+            self._energy += float(last.native_value)
+            self._set_value(round(self._energy, 4))
+
+    def _update_attrs(self) -> None:
+        now = time.monotonic()
+        if self._power is not None:
+            # Watt-seconds to kWh.
+            self._energy += self._power * (now - self._sampled_at) / 3_600_000
+        power = self.get_reported_number("cur_power") if self.available else None
+        self._power = None if power is None else max(float(power), 0.0)
+        self._sampled_at = now
+        self._set_value(round(self._energy, 4))
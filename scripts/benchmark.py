@@ -0,0 +1,194 @@
+"""
+Offline benchmarks for snapshot parsing and entity attribute computation.
+
+Uses synthetic homes (see synthetic_home.py), so no token or network is needed.
+Numbers are the median and minimum of several timed repeats per case. Cases
+marked "(compact)" use CompactDevice records instead of the raw payload.
+
+Run:
+    ./scripts/bench
+    ./scripts/bench --sizes 10 100 --json bench.json
+    ./scripts/bench --compare bench.json
+"""
+
+import argparse
+import copy
+import json
+import os
+import random
+import statistics
+import sys
+import timeit
+import tracemalloc
+from collections.abc import Callable
+from typing import Any
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from synthetic_home import synthetic_tree
+
+from custom_components.sberdevices.core.descriptors import DeviceEntityIndex
+from custom_components.sberdevices.core.gateway import json_loads
+from custom_components.sberdevices.core.snapshot import (
+    DeviceCache,
+    apply_device_state_patch,
+    diff_device_caches,
+    extract_devices,
+)
+from custom_components.sberdevices.light import LightProfiles, SberLightEntity
+from custom_components.sberdevices.switch import SberSwitchEntity
+from homeassistant.const import Platform
+
+DEFAULT_SIZES = (10, 100, 1000, 5000)
+CHANGED_DEVICE_SHARE = 0.05
+
+
+class StubCoordinator:
+    """Just enough of the coordinator for entities to read snapshot data."""
+
+    def __init__(self, data: DeviceCache) -> None:
+        self.data = data
+        self.entity_index = DeviceEntityIndex()
+        self.entity_index.rebuild(data)
+
+
+def measure(func: Callable[[], object], repeat: int) -> tuple[float, float]:
+    """Return (median, min) seconds per call of ``func``."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    samples = [elapsed / number for elapsed in timer.repeat(repeat=repeat, number=number)]
+    return statistics.median(samples), min(samples)
+
+
+def peak_memory(func: Callable[[], object]) -> int:
+    """Return the peak traced allocation in bytes while ``func`` runs."""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def retained_memory(func: Callable[[], object]) -> int:
+    """Return the traced allocation in bytes still held by the result of ``func``."""
+    tracemalloc.start()
+    try:
+        result = func()
+        retained = tracemalloc.get_traced_memory()[0]
+        del result
+        return retained
+    finally:
+        tracemalloc.stop()
+
+
+def mutated_tree(tree: dict[str, Any], share: float, seed: int) -> dict[str, Any]:
+    """Copy ``tree`` and flip ``on_off`` on a share of its devices."""
+    tree = copy.deepcopy(tree)
+    devices = [record.to_snapshot() for record in extract_devices(tree).values()]
+    rng = random.Random(seed)
+    for device in rng.sample(devices, max(1, int(len(devices) * share))):
+        state = next(state for state in device["desired_state"] if state["key"] == "on_off")
+        state["bool_value"] = not state["bool_value"]
+    return tree
+
+
+def build_entities(coordinator: StubCoordinator) -> tuple[list[SberLightEntity], list[SberSwitchEntity]]:
+    index = coordinator.entity_index
+    profiles = LightProfiles()
+    lights = [
+        SberLightEntity(coordinator, device_id, descriptor.variant, profiles)  # type: ignore[arg-type]
+        for device_id, descriptors in index.platform(Platform.LIGHT).items()
+        for descriptor in descriptors
+    ]
+    switches = [
+        SberSwitchEntity(coordinator, device_id)  # type: ignore[arg-type]
+        for device_id in index.platform(Platform.SWITCH)
+    ]
+    return lights, switches
+
+
+def snapshot_cases(tree: dict[str, Any], bodies: list[bytes], compact: bool) -> dict[str, Callable[[], object]]:
+    coordinator = StubCoordinator(extract_devices(tree, compact=compact))
+    lights, switches = build_entities(coordinator)
+    entities = {entity._device_id: entity for entity in [*lights, *switches]}
+    first_id = next(iter(coordinator.data))
+    patch = [{"key": "on_off", "bool_value": True}, {"key": "light_brightness", "integer_value": 500}]
+    tick_state = {"body": 0}
+
+    def coordinator_tick() -> None:
+        tick_state["body"] ^= 1
+        devices = extract_devices(json_loads(bodies[tick_state["body"]])["result"], compact=compact)
+        diff = diff_device_caches(coordinator.data, devices)
+        coordinator.data = devices
+        for device_id in diff.changed | diff.added:
+            if (entity := entities.get(device_id)) is not None:
+                entity._update_attrs()
+
+    return {
+        "extract_devices": lambda: extract_devices(tree, compact=compact),
+        "classify devices": lambda: DeviceEntityIndex().rebuild(coordinator.data),
+        "build entities": lambda: build_entities(coordinator),
+        "apply_device_state_patch": lambda: apply_device_state_patch(coordinator.data[first_id], patch),
+        "light.get_desired_value (all)": lambda: [light.get_desired_value("light_brightness") for light in lights],
+        "light._update_attrs (all)": lambda: [light._update_attrs() for light in lights],
+        "switch._update_attrs (all)": lambda: [switch._update_attrs() for switch in switches],
+        "coordinator tick": coordinator_tick,
+    }
+
+
+def bench_size(size: int, depth: int, repeat: int) -> dict[str, tuple[float, float]]:
+    tree = synthetic_tree(size, depth=depth)
+    bodies = [
+        json.dumps({"result": tree}).encode(),
+        json.dumps({"result": mutated_tree(tree, CHANGED_DEVICE_SHARE, size)}).encode(),
+    ]
+    cases: dict[str, Callable[[], object]] = {
+        "decode tree body (stdlib json)": lambda: json.loads(bodies[0].decode()),
+        "decode tree body (json_loads)": lambda: json_loads(bodies[0]),
+    }
+    for compact, suffix in ((False, ""), (True, " (compact)")):
+        cases.update((f"{name}{suffix}", func) for name, func in snapshot_cases(tree, bodies, compact).items())
+    results = {name: measure(func, repeat) for name, func in cases.items()}
+
+    peak = peak_memory(lambda: extract_devices(json_loads(bodies[0])["result"]))
+    print(f"{'poll peak memory (body excluded)':<50}{size:>8}{peak / 2**20:>13.2f}M")
+    for compact, suffix in ((False, ""), (True, " (compact)")):
+        retained = retained_memory(
+            lambda compact=compact: extract_devices(json_loads(bodies[0])["result"], compact=compact)
+        )
+        print(f"{'snapshot memory per device' + suffix:<50}{size:>8}{retained / size:>13.0f}B")
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="device counts to benchmark")
+    parser.add_argument("--depth", type=int, default=4, help="nesting depth of the group tree")
+    parser.add_argument("--repeat", type=int, default=7, help="timed repeats per case")
+    parser.add_argument("--json", dest="json_path", help="write results to this JSON file")
+    parser.add_argument("--compare", help="JSON file from a previous run to compare against")
+    args = parser.parse_args()
+
+    baseline: dict[str, float] = {}
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+
+    results: dict[str, float] = {}
+    print(f"{'case':<50}{'devices':>8}{'median µs':>14}{'min µs':>14}{'vs base':>10}")
+    for size in args.sizes:
+        for name, (median, minimum) in bench_size(size, args.depth, args.repeat).items():
+            key = f"{name}[{size}]"
+            results[key] = median
+            ratio = f"{median / baseline[key]:.2f}x" if key in baseline else ""
+            print(f"{name:<50}{size:>8}{median * 1e6:>14.1f}{minimum * 1e6:>14.1f}{ratio:>10}")
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as json_file:
+            json.dump(results, json_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
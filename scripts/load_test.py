@@ -0,0 +1,168 @@
+"""
+Offline load test of the auth and gateway clients against the mock gateway.
+
+Starts MockSberGateway in-process, then runs several simulated config entries
+that poll the device tree and send state writes for a fixed duration. Prints
+throughput, error counts and latency percentiles per operation. With
+--shared-engine the entries share one connection pool and poll budget, as
+config entries do in Home Assistant.
+
+Run:
+    uv run python scripts/load_test.py --entries 4 --devices 300 --latency 0.03 --token-expiry-rate 0.02
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from collections import defaultdict
+from collections.abc import Awaitable
+from contextlib import AbstractAsyncContextManager, nullcontext
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from mock_gateway import MockSberGateway, parse_config
+
+from custom_components.sberdevices.core.auth import SberAuthClient
+from custom_components.sberdevices.core.gateway import SberHomeGatewayClient
+from custom_components.sberdevices.core.polling import PollingEngine
+from custom_components.sberdevices.core.transport import SberHttpTransport
+
+type Samples = dict[str, list[float]]
+
+
+def percentile(samples: list[float], share: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * share))]
+
+
+class PollGauge:
+    """Count polls in flight across entries."""
+
+    def __init__(self) -> None:
+        self.current = 0
+        self.peak = 0
+
+    async def run(self, poll: Awaitable[object]) -> None:
+        self.current += 1
+        self.peak = max(self.peak, self.current)
+        try:
+            await poll
+        finally:
+            self.current -= 1
+
+
+async def run_entry(
+    gateway: MockSberGateway,
+    deadline: float,
+    poll_interval: float,
+    writes_per_poll: int,
+    seed: int,
+    gauge: PollGauge,
+    engine: PollingEngine | None,
+) -> tuple[Samples, dict[str, int]]:
+    latencies: Samples = defaultdict(list)
+    errors: dict[str, int] = defaultdict(int)
+    rng = random.Random(seed)
+    auth_client = SberAuthClient(
+        token=gateway.oauth_token(),
+        transport=engine.transport if engine is not None else None,
+        token_endpoint=gateway.token_endpoint,
+        companion_token_url=gateway.companion_token_url,
+    )
+    gateway_client = SberHomeGatewayClient(auth_client, base_url=gateway.gateway_url)
+    device_ids = list(gateway.devices)
+
+    async def timed(name: str, operation: Awaitable[object]) -> None:
+        started = time.perf_counter()
+        try:
+            await operation
+        except Exception:
+            errors[name] += 1
+        else:
+            latencies[name].append(time.perf_counter() - started)
+
+    try:
+        while time.monotonic() < deadline:
+            slot: AbstractAsyncContextManager[float] = engine.poll_slot() if engine is not None else nullcontext(0.0)
+            async with slot:
+                await timed("poll", gauge.run(gateway_client.get_devices()))
+            writes = [
+                timed(
+                    "write",
+                    gateway_client.set_device_state(
+                        rng.choice(device_ids), [{"key": "on_off", "bool_value": rng.random() < 0.5}]
+                    ),
+                )
+                for _ in range(writes_per_poll)
+            ]
+            await asyncio.gather(*writes)
+            await asyncio.sleep(poll_interval)
+    finally:
+        await gateway_client.async_close()
+        await auth_client.async_close()
+    return latencies, errors
+
+
+async def load_test(args: argparse.Namespace, gateway: MockSberGateway) -> None:
+    await gateway.start()
+    gauge = PollGauge()
+    engine = PollingEngine(SberHttpTransport(), stagger=args.stagger) if args.shared_engine else None
+    started = time.monotonic()
+    try:
+        results = await asyncio.gather(
+            *(
+                run_entry(
+                    gateway, started + args.duration, args.poll_interval, args.writes_per_poll, seed, gauge, engine
+                )
+                for seed in range(args.entries)
+            )
+        )
+    finally:
+        if engine is not None:
+            await engine.async_close()
+        await gateway.stop()
+    elapsed = time.monotonic() - started
+
+    latencies: Samples = defaultdict(list)
+    errors: dict[str, int] = defaultdict(int)
+    for entry_latencies, entry_errors in results:
+        for name, samples in entry_latencies.items():
+            latencies[name].extend(samples)
+        for name, count in entry_errors.items():
+            errors[name] += count
+
+    print(f"{args.entries} entries, {len(gateway.devices)} devices, {elapsed:.1f} s")
+    print(f"server requests: {dict(gateway.requests)}")
+    print(f"peak concurrent polls: {gauge.peak}")
+    if engine is not None:
+        print(f"polling engine: {engine.as_dict()}")
+    print(f"{'operation':<10}{'ok':>8}{'errors':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, samples in sorted(latencies.items()):
+        print(
+            f"{name:<10}{len(samples):>8}{errors[name]:>8}{len(samples) / elapsed:>10.1f}"
+            f"{statistics.median(samples) * 1e3:>10.1f}{percentile(samples, 0.95) * 1e3:>10.1f}"
+            f"{percentile(samples, 0.99) * 1e3:>10.1f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=1, help="simulated config entries")
+    parser.add_argument("--duration", type=float, default=10.0, help="test duration in seconds")
+    parser.add_argument("--poll-interval", type=float, default=0.5, help="pause between polls in seconds")
+    parser.add_argument("--writes-per-poll", type=int, default=5, help="state writes sent after each poll")
+    parser.add_argument("--shared-engine", action="store_true", help="share one pool and poll budget across entries")
+    parser.add_argument(
+        "--stagger", type=float, default=0.1, help="minimum spacing of poll starts with --shared-engine"
+    )
+    config, args = parse_config(parser)
+    asyncio.run(load_test(args, MockSberGateway(config)))
+
+
+if __name__ == "__main__":
+    main()
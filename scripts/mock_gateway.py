@@ -0,0 +1,240 @@
+"""
+Local stand-in for the Sber OAuth, companion and gateway endpoints.
+
+Serves a synthetic home (see synthetic_home.py) with configurable latency and
+error injection, including code 16 gateway token expiry. Point the clients at
+it with ``MockSberGateway.gateway_url``, ``token_endpoint`` and
+``companion_token_url``.
+
+Run:
+    uv run python scripts/mock_gateway.py --devices 500 --latency 0.05 --token-expiry-rate 0.01
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import random
+import secrets
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from synthetic_home import synthetic_tree
+
+GATEWAY_PATH = "/gateway/v1"
+TOKEN_PATH = "/oauth/token"
+COMPANION_TOKEN_PATH = "/companion/token"
+
+
+@dataclass(slots=True)
+class MockGatewayConfig:
+    """Behaviour of the mock gateway."""
+
+    devices: int = 100
+    depth: int = 3
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    token_expiry_rate: float = 0.0
+    token_ttl: float = 3600.0
+    etag: bool = False
+    seed: int = 0
+
+
+def _jwt(claims: dict[str, Any]) -> str:
+    def encode(part: dict[str, Any]) -> str:
+        return base64.urlsafe_b64encode(json.dumps(part).encode()).rstrip(b"=").decode()
+
+    return f"{encode({'alg': 'none', 'typ': 'JWT'})}.{encode(claims)}.mock"
+
+
+def _gateway_error(status: int, code: int, message: str) -> web.Response:
+    return web.json_response({"code": code, "message": message}, status=status)
+
+
+class MockSberGateway:
+    """In-process mock of the Sber endpoints used by the integration."""
+
+    def __init__(self, config: MockGatewayConfig | None = None) -> None:
+        self.config = config or MockGatewayConfig()
+        self.tree = synthetic_tree(self.config.devices, depth=self.config.depth, seed=self.config.seed)
+        self.devices: dict[str, dict[str, Any]] = {}
+        pending = [self.tree]
+        while pending:
+            node = pending.pop()
+            self.devices.update((device["id"], device) for device in node["devices"])
+            pending.extend(node["children"])
+
+        self.requests: Counter[str] = Counter()
+        self._rng = random.Random(self.config.seed)
+        self._gateway_tokens: dict[str, float] = {}
+        self._runner: web.AppRunner | None = None
+        self.base_url = ""
+
+    @property
+    def gateway_url(self) -> str:
+        return f"{self.base_url}{GATEWAY_PATH}"
+
+    @property
+    def token_endpoint(self) -> str:
+        return f"{self.base_url}{TOKEN_PATH}"
+
+    @property
+    def companion_token_url(self) -> str:
+        return f"{self.base_url}{COMPANION_TOKEN_PATH}"
+
+    def oauth_token(self) -> dict[str, Any]:
+        """Return an OAuth token the auth client accepts without a login flow."""
+        return {
+            "access_token": secrets.token_urlsafe(16),
+            "refresh_token": secrets.token_urlsafe(16),
+            "token_type": "Bearer",
+            "expires_at": int(time.time() + self.config.token_ttl),
+        }
+
+    def expire_gateway_tokens(self) -> None:
+        """Invalidate every issued gateway token, as a server-side expiry would."""
+        self._gateway_tokens.clear()
+
+    def application(self) -> web.Application:
+        app = web.Application(middlewares=[self._latency_middleware])
+        app.router.add_post(TOKEN_PATH, self._handle_oauth_token)
+        app.router.add_get(COMPANION_TOKEN_PATH, self._handle_companion_token)
+        app.router.add_get(f"{GATEWAY_PATH}/device_groups/tree", self._handle_device_tree)
+        app.router.add_put(f"{GATEWAY_PATH}/devices/{{device_id}}/state", self._handle_device_state)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        self._runner = web.AppRunner(self.application())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        bound_port = self._runner.addresses[0][1]
+        self.base_url = f"http://{host}:{bound_port}"
+        return self.base_url
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    @web.middleware
+    async def _latency_middleware(self, request: web.Request, handler: Any) -> web.StreamResponse:
+        self.requests[request.path if not request.path.endswith("/state") else "PUT state"] += 1
+        delay = self.config.latency + self._rng.uniform(0, self.config.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return await handler(request)
+
+    async def _handle_oauth_token(self, request: web.Request) -> web.Response:
+        token = self.oauth_token()
+        return web.json_response({**token, "expires_in": int(self.config.token_ttl)})
+
+    async def _handle_companion_token(self, request: web.Request) -> web.Response:
+        if not request.headers.get("Authorization", "").startswith("Bearer "):
+            return web.json_response({"message": "unauthorized"}, status=401)
+
+        expires_at = time.time() + self.config.token_ttl
+        token = _jwt({"sub": "mock", "exp": int(expires_at), "jti": secrets.token_hex(8)})
+        self._gateway_tokens[token] = expires_at
+        return web.json_response({"token": token})
+
+    def _check_gateway_request(self, request: web.Request) -> web.Response | None:
+        token = request.headers.get("X-AUTH-jwt", "")
+        expires_at = self._gateway_tokens.get(token)
+        if expires_at is None or expires_at < time.time() or self._rng.random() < self.config.token_expiry_rate:
+            self._gateway_tokens.pop(token, None)
+            return _gateway_error(401, 16, "token expired")
+        if self._rng.random() < self.config.error_rate:
+            return _gateway_error(500, 13, "injected error")
+        return None
+
+    async def _handle_device_tree(self, request: web.Request) -> web.Response:
+        if (error := self._check_gateway_request(request)) is not None:
+            return error
+        body = json.dumps({"result": self.tree}).encode()
+        if not self.config.etag:
+            return web.Response(body=body, content_type="application/json")
+
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag})
+        return web.Response(body=body, content_type="application/json", headers={"ETag": etag})
+
+    async def _handle_device_state(self, request: web.Request) -> web.Response:
+        if (error := self._check_gateway_request(request)) is not None:
+            return error
+
+        device = self.devices.get(request.match_info["device_id"])
+        if device is None:
+            return _gateway_error(404, 5, "device not found")
+
+        payload = await request.json()
+        for field in ("desired_state", "reported_state"):
+            states = {state["key"]: state for state in device.setdefault(field, [])}
+            for patched_state in payload["desired_state"]:
+                if patched_state["key"] in states:
+                    states[patched_state["key"]].update(patched_state)
+                else:
+                    device[field].append(dict(patched_state))
+        return web.json_response({})
+
+
+async def serve(config: MockGatewayConfig, host: str, port: int) -> None:
+    gateway = MockSberGateway(config)
+    await gateway.start(host, port)
+    print(f"Mock Sber gateway with {len(gateway.devices)} devices")
+    print(f"  gateway:         {gateway.gateway_url}")
+    print(f"  oauth token:     {gateway.token_endpoint}")
+    print(f"  companion token: {gateway.companion_token_url}")
+    print(f"  sample token:    {json.dumps(gateway.oauth_token())}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await gateway.stop()
+
+
+def parse_config(parser: argparse.ArgumentParser) -> tuple[MockGatewayConfig, argparse.Namespace]:
+    parser.add_argument("--devices", type=int, default=100, help="number of synthetic devices")
+    parser.add_argument("--depth", type=int, default=3, help="nesting depth of the group tree")
+    parser.add_argument("--latency", type=float, default=0.0, help="base response latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of gateway requests failing")
+    parser.add_argument("--token-expiry-rate", type=float, default=0.0, help="share of requests answered with code 16")
+    parser.add_argument("--token-ttl", type=float, default=3600.0, help="lifetime of issued tokens in seconds")
+    parser.add_argument("--etag", action="store_true", help="tag the device tree and answer If-None-Match with 304")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the home and injected failures")
+    args = parser.parse_args()
+    config = MockGatewayConfig(
+        devices=args.devices,
+        depth=args.depth,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        token_expiry_rate=args.token_expiry_rate,
+        token_ttl=args.token_ttl,
+        etag=args.etag,
+        seed=args.seed,
+    )
+    return config, args
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    config, args = parse_config(parser)
+    asyncio.run(serve(config, args.host, args.port))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Synthetic SberDevices homes for offline benchmarks and the mock gateway.
+
+The generated payloads follow the shape of ``/device_groups/tree`` responses
+and are deterministic for a given size, depth and seed.
+"""
+
+import random
+from typing import Any
+
+LIGHT_MODES = ["white", "colour", "scene", "music", "adaptive"]
+LIGHT_SCENES = ["sunrise", "sunset", "candle", "party", "reading", "relax"]
+DEVICE_KINDS = ("bulb_sber", "ledstrip_sber", "dt_socket_sber")
+
+
+def _range_attribute(key: str, low: int, high: int) -> dict[str, Any]:
+    return {"key": key, "type": "INTEGER", "int_values": {"range": {"min": low, "max": high, "step": 1}}}
+
+
+def _enum_attribute(key: str, values: list[str]) -> dict[str, Any]:
+    return {"key": key, "type": "ENUM", "enum_values": {"values": values}}
+
+
+def _light_device(rng: random.Random, kind: str) -> dict[str, Any]:
+    modes = LIGHT_MODES if kind.startswith("ledstrip") else LIGHT_MODES[:3]
+    return {
+        "attributes": [
+            _enum_attribute("light_mode", modes),
+            _range_attribute("light_brightness", 50, 1000),
+            _range_attribute("light_colour_temp", 0, 1000),
+            {
+                "key": "light_colour",
+                "type": "COLOR",
+                "color_values": {
+                    "h": {"min": 0, "max": 360},
+                    "s": {"min": 0, "max": 1000},
+                    "v": {"min": 100, "max": 1000},
+                },
+            },
+            _enum_attribute("light_scene", LIGHT_SCENES),
+        ],
+        "desired_state": [
+            {"key": "on_off", "type": "BOOL", "bool_value": rng.random() < 0.5},
+            {"key": "light_mode", "type": "ENUM", "enum_value": rng.choice(modes[:2])},
+            {"key": "light_brightness", "type": "INTEGER", "integer_value": str(rng.randint(50, 1000))},
+            {"key": "light_colour_temp", "type": "INTEGER", "integer_value": str(rng.randint(0, 1000))},
+            {
+                "key": "light_colour",
+                "type": "COLOR",
+                "color_value": {"h": rng.randint(0, 360), "s": rng.randint(0, 1000), "v": rng.randint(100, 1000)},
+            },
+            {"key": "light_scene", "type": "ENUM", "enum_value": rng.choice(LIGHT_SCENES)},
+        ],
+        "reported_state": [
+            {"key": "online", "type": "BOOL", "bool_value": True},
+            {"key": "on_off", "type": "BOOL", "bool_value": rng.random() < 0.5},
+        ],
+    }
+
+
+def _socket_device(rng: random.Random) -> dict[str, Any]:
+    return {
+        "attributes": [{"key": "on_off", "type": "BOOL"}],
+        "desired_state": [{"key": "on_off", "type": "BOOL", "bool_value": rng.random() < 0.5}],
+        "reported_state": [
+            {"key": "online", "type": "BOOL", "bool_value": True},
+            {"key": "on_off", "type": "BOOL", "bool_value": rng.random() < 0.5},
+            {"key": "cur_voltage", "type": "INTEGER", "integer_value": str(rng.randint(215, 235))},
+            {"key": "cur_current", "type": "INTEGER", "integer_value": str(rng.randint(0, 10000))},
+            {"key": "cur_power", "type": "FLOAT", "float_value": round(rng.uniform(0, 2000), 1)},
+        ],
+    }
+
+
+def synthetic_device(rng: random.Random, index: int) -> dict[str, Any]:
+    """Build one device snapshot; kinds rotate between bulbs, LED strips and sockets."""
+    kind = DEVICE_KINDS[index % len(DEVICE_KINDS)]
+    device_id = f"device-{index:06d}"
+    payload = _socket_device(rng) if kind == "dt_socket_sber" else _light_device(rng, kind)
+    return {
+        "id": device_id,
+        "name": {"name": f"{kind} {index}"},
+        "serial_number": f"SN{index:010d}",
+        "device_info": {"manufacturer": "Sber", "model": f"SB-{kind.split('_')[0].upper()}-01"},
+        "sw_version": "1.0.0",
+        "image_set_type": kind,
+        **payload,
+    }
+
+
+def synthetic_tree(device_count: int, depth: int = 3, fanout: int = 3, seed: int = 0) -> dict[str, Any]:
+    """Build a device tree with ``device_count`` devices spread over nested groups."""
+    rng = random.Random(seed)
+    devices = [synthetic_device(rng, index) for index in range(device_count)]
+
+    def build(level: int, path: str) -> dict[str, Any]:
+        children = [build(level + 1, f"{path}.{i}") for i in range(fanout)] if level < depth else []
+        return {"id": f"group{path}", "name": {"name": f"Group {path}"}, "devices": [], "children": children}
+
+    root = build(0, "")
+    groups: list[dict[str, Any]] = []
+    pending = [root]
+    while pending:
+        group = pending.pop()
+        groups.append(group)
+        pending.extend(group["children"])
+
+    for index, device in enumerate(devices):
+        groups[index % len(groups)]["devices"].append(device)
+    return root
@@ -0,0 +1,76 @@
+"""Shared fixtures for tests against the local mock gateway.
+
+Tests that need a different mock setup override ``gateway_config``, e.g. with
+``@pytest.mark.parametrize("gateway_config", [MockGatewayConfig(...)])``.
+"""
+
+from collections.abc import AsyncIterator, Callable
+from typing import Any
+
+import pytest
+
+from custom_components.sberdevices.core.auth import SberAuthClient
+from custom_components.sberdevices.core.gateway import SberHomeGatewayClient
+from scripts.mock_gateway import MockGatewayConfig, MockSberGateway
+
+
+@pytest.fixture
+def gateway_config() -> MockGatewayConfig:
+    return MockGatewayConfig(devices=30, depth=2)
+
+
+@pytest.fixture
+async def gateway(gateway_config: MockGatewayConfig) -> AsyncIterator[MockSberGateway]:
+    """A started mock gateway, stopped after the test."""
+    gateway = MockSberGateway(gateway_config)
+    await gateway.start()
+    try:
+        yield gateway
+    finally:
+        await gateway.stop()
+
+
+@pytest.fixture
+async def make_auth_client(gateway: MockSberGateway) -> AsyncIterator[Callable[..., SberAuthClient]]:
+    """Build auth clients for the mock gateway; all of them are closed after the test."""
+    clients: list[SberAuthClient] = []
+
+    def make(**kwargs: Any) -> SberAuthClient:
+        client = SberAuthClient(
+            token=gateway.oauth_token(),
+            token_endpoint=gateway.token_endpoint,
+            companion_token_url=gateway.companion_token_url,
+            **kwargs,
+        )
+        clients.append(client)
+        return client
+
+    try:
+        yield make
+    finally:
+        for client in clients:
+            await client.async_close()
+
+
+@pytest.fixture
+async def make_gateway_client(
+    gateway: MockSberGateway, make_auth_client: Callable[..., SberAuthClient]
+) -> AsyncIterator[Callable[..., SberHomeGatewayClient]]:
+    """Build gateway clients for the mock gateway; all of them are closed after the test."""
+    clients: list[SberHomeGatewayClient] = []
+
+    def make(auth_client: SberAuthClient | None = None, **kwargs: Any) -> SberHomeGatewayClient:
+        client = SberHomeGatewayClient(auth_client or make_auth_client(), base_url=gateway.gateway_url, **kwargs)
+        clients.append(client)
+        return client
+
+    try:
+        yield make
+    finally:
+        for client in clients:
+            await client.async_close()
+
+
+@pytest.fixture
+def gateway_client(make_gateway_client: Callable[..., SberHomeGatewayClient]) -> SberHomeGatewayClient:
+    return make_gateway_client()
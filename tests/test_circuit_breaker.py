@@ -0,0 +1,53 @@
+"""Gateway circuit breaker and bounded retries.
+
+Run:
+    ./scripts/test tests/test_circuit_breaker.py
+"""
+
+import asyncio
+from collections.abc import Callable
+
+import pytest
+
+from custom_components.sberdevices.core.gateway import (
+    CircuitBreaker,
+    CircuitOpenError,
+    CircuitState,
+    RetryPolicy,
+    SberHomeGatewayClient,
+)
+from scripts.mock_gateway import MockGatewayConfig, MockSberGateway
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("gateway_config", [MockGatewayConfig(devices=30, depth=2, error_rate=1.0)])
+async def test_circuit_breaker(
+    gateway: MockSberGateway, make_gateway_client: Callable[..., SberHomeGatewayClient]
+) -> None:
+    """Failing GETs are retried until the circuit opens, then requests fail fast until a probe succeeds."""
+    gateway_client = make_gateway_client(
+        circuit_breaker=CircuitBreaker(failure_threshold=2, reset_timeout=0.1),
+        retry_policy=RetryPolicy(attempts=3, base_delay=0.01, max_delay=0.01),
+    )
+    tree_path = "/gateway/v1/device_groups/tree"
+    device_id = next(iter(gateway.devices))
+
+    with pytest.raises(CircuitOpenError):
+        await gateway_client.get_devices()
+    assert gateway.requests[tree_path] == 2
+    assert gateway_client.circuit_breaker.state is CircuitState.OPEN
+
+    # An expired token is not refreshed while the circuit is open.
+    gateway_client._invalidate_gateway_token(gateway_client._gateway_token)
+    with pytest.raises(CircuitOpenError):
+        await gateway_client.set_device_state(device_id, [{"key": "on_off", "bool_value": True}])
+    assert gateway.requests["PUT state"] == 0
+    assert gateway.requests["/companion/token"] == 1
+
+    gateway.config.error_rate = 0.0
+    await asyncio.sleep(0.1)
+    devices = await gateway_client.get_devices()
+
+    assert len(devices) == 30
+    assert gateway_client.circuit_breaker.state is CircuitState.CLOSED
+    assert gateway_client.circuit_breaker.rejected == 2
@@ -0,0 +1,36 @@
+"""Command round trips tracked until devices report them.
+
+Run:
+    ./scripts/test tests/test_command_tracker.py
+"""
+
+import pytest
+
+from custom_components.sberdevices.core.gateway import SberHomeGatewayClient
+from custom_components.sberdevices.core.metrics import CommandTracker
+from scripts.mock_gateway import MockSberGateway
+
+
+@pytest.mark.asyncio
+async def test_command_convergence(gateway: MockSberGateway, gateway_client: SberHomeGatewayClient) -> None:
+    """A written command converges once reported; a command the device never applies is flagged."""
+    tracker = CommandTracker(timeout=60)
+    written_id, lost_id = list(gateway.devices)[:2]
+    lost_on_off = next(state for state in gateway.devices[lost_id]["reported_state"] if state["key"] == "on_off")
+    written_command = [{"key": "on_off", "bool_value": True}]
+    lost_command = [{"key": "on_off", "bool_value": not lost_on_off["bool_value"]}]
+
+    tracker.record_command(written_id, written_command, 0.0)
+    tracker.record_command(lost_id, lost_command, 0.0)
+    await gateway_client.set_device_state(written_id, written_command)
+    devices = await gateway_client.get_devices(compact=True)
+
+    tracker.check_all(devices, 1.5)
+    assert tracker.devices[written_id].converged == 1
+    assert tracker.devices[written_id].latency.max == 1500
+    assert tracker.pending_devices == {lost_id}
+
+    tracker.check_all(devices, 61.0)
+    assert tracker.devices[lost_id].not_converged == 1
+    assert tracker.recent_failures[0]["device_id"] == lost_id
+    assert not tracker.pending_devices
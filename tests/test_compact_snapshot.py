@@ -0,0 +1,30 @@
+"""Compact device records compared with the raw gateway snapshot.
+
+Run:
+    ./scripts/test tests/test_compact_snapshot.py
+"""
+
+import pytest
+
+from custom_components.sberdevices.core.gateway import SberHomeGatewayClient
+from custom_components.sberdevices.core.storage import dump_snapshot, load_snapshot
+
+
+@pytest.mark.asyncio
+async def test_compact_snapshot(gateway_client: SberHomeGatewayClient) -> None:
+    """Compact records decode the same values as the raw snapshot and survive a storage round trip."""
+    raw = await gateway_client.get_devices()
+    compact = await gateway_client.get_devices(compact=True)
+
+    assert compact.keys() == raw.keys()
+    restored = load_snapshot(dump_snapshot(compact), compact=True)
+    for device_id, device in compact.items():
+        for snapshot in (raw[device_id], restored[device_id]):
+            assert {key: snapshot.desired_value(key) for key in snapshot.desired_state} == device.desired_state
+            assert {key: snapshot.reported_value(key) for key in snapshot.reported_state} == device.reported_state
+            assert snapshot.attributes == device.attributes
+            assert snapshot.image_set_type == device.image_set_type
+    # Attribute maps are shared within a snapshot but not across snapshots.
+    shared = {id(device.attributes) for device in compact.values()}
+    assert len(shared) < len(compact)
+    assert shared.isdisjoint(id(device.attributes) for device in restored.values())
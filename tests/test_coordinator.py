@@ -0,0 +1,213 @@
+"""Coordinator refreshes against a stub gateway and a real Home Assistant core.
+
+Run:
+    ./scripts/test tests/test_coordinator.py
+"""
+
+import copy
+from collections.abc import AsyncIterator
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from custom_components.sberdevices.const import DEVICE_REMOVAL_POLLS, DOMAIN
+from custom_components.sberdevices.core.coordinator import SberDataUpdateCoordinator
+from custom_components.sberdevices.core.descriptors import DeviceDescriptors
+from custom_components.sberdevices.core.metrics import PerformanceMetrics
+from custom_components.sberdevices.core.snapshot import extract_devices
+from custom_components.sberdevices.core.storage import dump_snapshot, snapshot_store
+from homeassistant.config_entries import ConfigEntries, ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
+from scripts.synthetic_home import synthetic_tree
+
+
+class StubGatewayClient:
+    """Gateway client stand-in that serves whatever ``tree`` currently holds."""
+
+    def __init__(self) -> None:
+        self.tree: dict[str, Any] = synthetic_tree(30, depth=2)
+        self.metrics = PerformanceMetrics()
+
+    async def get_device_tree(self) -> dict[str, Any]:
+        return copy.deepcopy(self.tree)
+
+    async def get_device_tree_if_changed(self) -> dict[str, Any]:
+        return copy.deepcopy(self.tree)
+
+    def forget_device_tree(self) -> None:
+        pass
+
+    def take_device(self, device_id: str) -> dict[str, Any]:
+        """Drop a top-level device from the tree and return it."""
+        devices = self.tree["devices"]
+        return devices.pop(next(index for index, device in enumerate(devices) if device["id"] == device_id))
+
+
+@pytest.fixture
+async def hass(tmp_path: Path) -> AsyncIterator[HomeAssistant]:
+    hass = HomeAssistant(str(tmp_path))
+    hass.config_entries = ConfigEntries(hass, {})
+    await dr.async_load(hass)
+    await er.async_load(hass)
+    try:
+        yield hass
+    finally:
+        await hass.async_stop(force=True)
+
+
+@pytest.fixture
+def entry(hass: HomeAssistant) -> ConfigEntry:
+    entry = ConfigEntry(
+        domain=DOMAIN,
+        data={},
+        title="Sber",
+        source="user",
+        version=1,
+        minor_version=1,
+        options={},
+        unique_id=None,
+        discovery_keys={},
+        subentries_data=None,
+    )
+    hass.config_entries._entries[entry.entry_id] = entry
+    return entry
+
+
+@pytest.fixture
+def gateway_client() -> StubGatewayClient:
+    return StubGatewayClient()
+
+
+@pytest.fixture
+async def coordinator(
+    hass: HomeAssistant, entry: ConfigEntry, gateway_client: StubGatewayClient
+) -> SberDataUpdateCoordinator:
+    """A coordinator after its first refresh, with a registry device per gateway device as the platforms add."""
+    coordinator = SberDataUpdateCoordinator(hass, entry, gateway_client)  # type: ignore[arg-type]
+    await coordinator.async_refresh()
+    registry = dr.async_get(hass)
+    for device in coordinator.data.values():
+        registry.async_get_or_create(config_entry_id=entry.entry_id, identifiers={(DOMAIN, device.serial_number)})
+    return coordinator
+
+
+def announcements(coordinator: SberDataUpdateCoordinator) -> list[DeviceDescriptors]:
+    """Record what the coordinator hands to the new-devices listeners."""
+    announced: list[DeviceDescriptors] = []
+    coordinator.async_add_new_devices_listener(announced.append)
+    return announced
+
+
+def registered(hass: HomeAssistant, entry: ConfigEntry, serial_number: str) -> bool:
+    device_entry = dr.async_get(hass).async_get_device(identifiers={(DOMAIN, serial_number)})
+    return device_entry is not None and entry.entry_id in device_entry.config_entries
+
+
+@pytest.mark.asyncio
+async def test_missing_device_is_kept_for_a_few_polls(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    gateway_client: StubGatewayClient,
+    coordinator: SberDataUpdateCoordinator,
+) -> None:
+    """A device missing from fewer than DEVICE_REMOVAL_POLLS polls keeps its registry device."""
+    device = gateway_client.take_device(gateway_client.tree["devices"][0]["id"])
+
+    for _ in range(DEVICE_REMOVAL_POLLS - 1):
+        await coordinator.async_refresh()
+        assert registered(hass, entry, device["serial_number"])
+
+    await coordinator.async_refresh()
+    assert not registered(hass, entry, device["serial_number"])
+    assert registered(hass, entry, gateway_client.tree["devices"][0]["serial_number"])
+
+
+@pytest.mark.asyncio
+async def test_device_back_before_removal_is_not_announced(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    gateway_client: StubGatewayClient,
+    coordinator: SberDataUpdateCoordinator,
+) -> None:
+    """A device back before its registry device is detached keeps its entities and is not added twice."""
+    announced = announcements(coordinator)
+    device = gateway_client.take_device(gateway_client.tree["devices"][0]["id"])
+
+    for _ in range(DEVICE_REMOVAL_POLLS - 1):
+        await coordinator.async_refresh()
+    gateway_client.tree["devices"].append(device)
+    await coordinator.async_refresh()
+    for _ in range(DEVICE_REMOVAL_POLLS):
+        await coordinator.async_refresh()
+
+    assert device["id"] in coordinator.data
+    assert not announced
+    assert registered(hass, entry, device["serial_number"])
+
+
+@pytest.mark.asyncio
+async def test_device_back_after_removal_is_announced(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    gateway_client: StubGatewayClient,
+    coordinator: SberDataUpdateCoordinator,
+) -> None:
+    """A device back after its registry device was detached is announced again, with all its descriptors."""
+    announced = announcements(coordinator)
+    device = gateway_client.take_device(gateway_client.tree["devices"][0]["id"])
+    descriptors = coordinator.entity_index.devices[device["id"]]
+
+    for _ in range(DEVICE_REMOVAL_POLLS):
+        await coordinator.async_refresh()
+    assert not registered(hass, entry, device["serial_number"])
+    gateway_client.tree["devices"].append(device)
+    await coordinator.async_refresh()
+
+    assert announced == [{device["id"]: descriptors}]
+
+
+@pytest.mark.asyncio
+async def test_listeners_wake_for_changed_devices(
+    gateway_client: StubGatewayClient, coordinator: SberDataUpdateCoordinator
+) -> None:
+    """A refresh wakes the listeners of changed devices and those without a device context."""
+    changed, unchanged = gateway_client.tree["devices"][:2]
+    woken: list[str | None] = []
+    for context in (changed["id"], unchanged["id"], None):
+        coordinator.async_add_listener(lambda context=context: woken.append(context), context)
+
+    on_off = next(state for state in changed["reported_state"] if state["key"] == "on_off")
+    on_off["bool_value"] = not on_off["bool_value"]
+    await coordinator.async_refresh()
+    assert sorted(woken, key=str) == sorted([changed["id"], None], key=str)
+
+    woken.clear()
+    await coordinator.async_refresh()
+    assert woken == [None]
+
+    woken.clear()
+    coordinator.async_patch_device_state(unchanged["id"], [{"key": "on_off", "bool_value": True}])
+    assert sorted(woken, key=str) == sorted([unchanged["id"], None], key=str)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("compact", [False, True])
+async def test_restore_snapshot(
+    hass: HomeAssistant, entry: ConfigEntry, gateway_client: StubGatewayClient, compact: bool
+) -> None:
+    """Setup can start from the stored snapshot, classified the same way as a fresh poll."""
+    coordinator = SberDataUpdateCoordinator(hass, entry, gateway_client, compact=compact)  # type: ignore[arg-type]
+    assert not await coordinator.async_restore_snapshot()
+
+    devices = extract_devices(gateway_client.tree, compact=compact)
+    await snapshot_store(hass, entry.entry_id).async_save(dump_snapshot(devices))
+    assert await coordinator.async_restore_snapshot()
+    assert coordinator.data.keys() == devices.keys()
+
+    polled = SberDataUpdateCoordinator(hass, entry, gateway_client, compact=compact)  # type: ignore[arg-type]
+    await polled.async_refresh()
+    assert polled.entity_index.devices
+    assert coordinator.entity_index.devices == polled.entity_index.devices
@@ -0,0 +1,75 @@
+"""Device classification into platform entities.
+
+Run:
+    ./scripts/test tests/test_descriptors.py
+"""
+
+from custom_components.sberdevices.core.descriptors import DeviceEntityIndex, EntityDescriptor
+from custom_components.sberdevices.core.snapshot import DeviceCacheDiff, extract_devices
+from homeassistant.const import Platform
+from scripts.synthetic_home import synthetic_tree
+
+
+def test_device_entity_index() -> None:
+    """Devices are classified by type and reported state, and the index follows added and removed devices."""
+    tree = synthetic_tree(30, depth=2)
+    kettle = tree["devices"][0]
+    kettle["image_set_type"] = "dt_kettle_sber"
+    devices = extract_devices(tree)
+    index = DeviceEntityIndex()
+    # Platforms keep the view they got at setup, so it must follow later changes.
+    switches = index.platform(Platform.SWITCH)
+    index.rebuild(devices)
+    assert switches
+
+    for device in devices.values():
+        descriptors = index.devices[device.id]
+        if "bulb" in device.image_set_type:
+            assert descriptors == (EntityDescriptor(Platform.LIGHT, "light", "bulb"),)
+        elif "ledstrip" in device.image_set_type:
+            assert descriptors == (EntityDescriptor(Platform.LIGHT, "light", "ledstrip"),)
+        elif "socket" in device.image_set_type:
+            assert descriptors[0] == EntityDescriptor(Platform.SWITCH, "switch")
+            assert {descriptor.key for descriptor in descriptors[1:]} <= {
+                "cur_power",
+                "cur_voltage",
+                "cur_current",
+                "energy",
+            }
+    assert index.unsupported == {kettle["id"]: "dt_kettle_sber"}
+    assert kettle["id"] not in index.platform(Platform.LIGHT)
+
+    socket_id = next(iter(index.platform(Platform.SWITCH)))
+    index.apply_diff(devices, DeviceCacheDiff(removed=frozenset({socket_id, kettle["id"]})))
+    assert socket_id not in index.platform(Platform.SWITCH)
+    assert socket_id not in index.platform(Platform.SENSOR)
+    assert not index.unsupported
+
+    index.apply_diff(devices, DeviceCacheDiff(added=frozenset({socket_id})))
+    assert socket_id in index.platform(Platform.SWITCH)
+    lights = [device for device in devices.values() if device.image_set_type.startswith(("bulb", "ledstrip"))]
+    assert len(index.platform(Platform.LIGHT)) == len(lights)
+
+
+def test_changed_device_gains_descriptors() -> None:
+    """A socket that starts reporting a meter gains its sensors, once, and keeps them when it stops."""
+    tree = synthetic_tree(30, depth=2)
+    socket = next(device for device in tree["devices"] if device["image_set_type"] == "dt_socket_sber")
+    meters = [state for state in socket["reported_state"] if state["key"] == "cur_power"]
+    socket["reported_state"] = [state for state in socket["reported_state"] if state["key"] != "cur_power"]
+    index = DeviceEntityIndex()
+    sensors = index.platform(Platform.SENSOR)
+    index.rebuild(extract_devices(tree))
+    assert {descriptor.key for descriptor in sensors[socket["id"]]} == {"cur_voltage", "cur_current"}
+
+    socket["reported_state"].extend(meters)
+    devices = extract_devices(tree)
+    changed = DeviceCacheDiff(changed=frozenset({socket["id"]}))
+    assert index.apply_diff(devices, changed) == {
+        socket["id"]: (EntityDescriptor(Platform.SENSOR, "cur_power"), EntityDescriptor(Platform.SENSOR, "energy"))
+    }
+    assert index.apply_diff(devices, changed) == {}
+
+    socket["reported_state"] = [state for state in socket["reported_state"] if state["key"] != "cur_power"]
+    assert index.apply_diff(extract_devices(tree), changed) == {}
+    assert len(sensors[socket["id"]]) == 4
@@ -0,0 +1,67 @@
+"""Gateway push channel test against a local stand-in server.
+
+Run:
+    ./scripts/test tests/test_event_stream.py
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from custom_components.sberdevices.core.gateway import SberHomeGatewayClient
+from custom_components.sberdevices.core.transport import SberHttpTransport
+
+SCRIPTED_EVENTS = [
+    {"device_id": "bulb-1", "reported_state": [{"key": "online", "bool_value": True}]},
+    {},
+    {"device_id": "bulb-1", "desired_state": [{"key": "on_off", "bool_value": False}]},
+]
+
+
+class StubAuthClient:
+    """Auth client stand-in that hands out a fixed gateway token."""
+
+    async def fetch_gateway_token(self) -> str:
+        return "token"
+
+
+async def serve_scripted_events(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    """Answer one request with newline-delimited events, then close the connection."""
+    await reader.readuntil(b"\r\n\r\n")
+    writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\nConnection: close\r\n\r\n")
+    for event in SCRIPTED_EVENTS:
+        writer.write(json.dumps(event).encode() + b"\n")
+        await writer.drain()
+    writer.close()
+
+
+@pytest.mark.asyncio
+async def test_stream_device_events() -> None:
+    """Pushed events are decoded in order and keep-alive messages are skipped."""
+    server = await asyncio.start_server(serve_scripted_events, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    transport = SberHttpTransport()
+    gateway_client = SberHomeGatewayClient(
+        StubAuthClient(),  # type: ignore[arg-type]
+        base_url=f"http://127.0.0.1:{port}",
+        events_url="/events",
+        transport=transport,
+    )
+
+    try:
+        events = [event async for event in gateway_client.stream_device_events()]
+    finally:
+        await gateway_client.async_close()
+        await transport.async_close()
+        server.close()
+        await server.wait_closed()
+
+    assert events == [SCRIPTED_EVENTS[0], SCRIPTED_EVENTS[2]]
+
+
+@pytest.mark.parametrize("events_url", ["https://example.com/events", "//example.com/events"])
+def test_events_url_must_stay_on_gateway(events_url: str) -> None:
+    """The push channel carries the gateway token, so it may only point at a path on the gateway."""
+    with pytest.raises(ValueError):
+        SberHomeGatewayClient(StubAuthClient(), events_url=events_url)  # type: ignore[arg-type]
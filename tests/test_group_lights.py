@@ -0,0 +1,40 @@
+"""Group light membership and aggregated state.
+
+Run:
+    ./scripts/test tests/test_group_lights.py
+"""
+
+from custom_components.sberdevices.core.snapshot import extract_devices
+from custom_components.sberdevices.light import LightGroupState, _group_members
+from scripts.synthetic_home import synthetic_tree
+
+
+def test_group_members() -> None:
+    """Lights count towards their group and every group above it; groups without a gateway id are skipped."""
+    tree = synthetic_tree(30, depth=2)
+    positional = tree["children"][0]
+    del positional["id"]
+    devices = extract_devices(tree)
+
+    members = _group_members(devices, devices)
+
+    assert members[tree["id"]] == devices.keys()
+    assert all(devices.groups[group_id].has_gateway_id for group_id in members)
+    for child in positional["children"]:
+        assert members[child["id"]] == {device["id"] for device in child["devices"]}
+
+
+def test_light_group_state() -> None:
+    """Brightness averages the members that are on; offline members drop out of the group."""
+    state = LightGroupState()
+    state.update("a", available=True, is_on=True, brightness=100)
+    state.update("b", available=True, is_on=True, brightness=200)
+    state.update("c", available=True, is_on=False, brightness=None)
+    assert (state.on, state.brightness) == ({"a", "b"}, 150)
+
+    state.update("b", available=True, is_on=False, brightness=200)
+    assert (state.on, state.brightness) == ({"a"}, 100)
+
+    state.update("a", available=False, is_on=True, brightness=100)
+    state.remove("c")
+    assert (state.available, state.on, state.brightness) == ({"b"}, set(), None)
@@ -0,0 +1,51 @@
+"""Light value scales and shared capability profiles.
+
+Run:
+    ./scripts/test tests/test_light.py
+"""
+
+import pytest
+
+from custom_components.sberdevices.const import COLOR_TEMP_RANGES, H_RANGE, S_RANGE
+from custom_components.sberdevices.core.snapshot import extract_devices
+from custom_components.sberdevices.light import BRIGHTNESS_RANGE, LightProfiles, RangeScale
+from homeassistant.util.color import brightness_to_value, value_to_brightness
+from homeassistant.util.scaling import scale_ranged_value_to_int_range
+from scripts.synthetic_home import synthetic_tree
+
+DEVICE_RANGES = [(0, 1000), (50, 1000), (100, 900), (1, 100), (0, 360)]
+
+
+@pytest.mark.parametrize("device_range", DEVICE_RANGES)
+def test_range_scale_matches_brightness_helpers(device_range: tuple[int, int]) -> None:
+    """Brightness conversions agree with value_to_brightness and brightness_to_value."""
+    scale = RangeScale.between(device_range, BRIGHTNESS_RANGE)
+    for value in range(device_range[0], device_range[1] + 1):
+        assert scale.to_brightness(value) == value_to_brightness(device_range, value)
+    for brightness in range(1, 256):
+        assert scale.from_brightness(brightness) == brightness_to_value(device_range, brightness)
+
+
+@pytest.mark.parametrize("device_range", DEVICE_RANGES)
+@pytest.mark.parametrize("ha_range", [H_RANGE, S_RANGE, BRIGHTNESS_RANGE, COLOR_TEMP_RANGES["ledstrip"]])
+def test_range_scale_matches_scaling(device_range: tuple[int, int], ha_range: tuple[int, int]) -> None:
+    """Integer conversions agree with scale_ranged_value_to_int_range in both directions."""
+    scale = RangeScale.between(device_range, ha_range)
+    for value in range(device_range[0], device_range[1] + 1):
+        assert scale.to_ha(value) == scale_ranged_value_to_int_range(device_range, ha_range, value)
+    for value in range(ha_range[0], ha_range[1] + 1):
+        assert scale.to_device(value) == scale_ranged_value_to_int_range(ha_range, device_range, value)
+
+
+def test_light_profiles_are_shared_and_immutable() -> None:
+    """Lights of one type, model and attribute set share a profile that cannot be mutated through an entity."""
+    devices = extract_devices(synthetic_tree(30, depth=2))
+    bulbs = [device for device in devices.values() if device.image_set_type == "bulb_sber"]
+    profiles = LightProfiles()
+
+    profile = profiles.get("bulb", bulbs[0])
+    assert all(profiles.get("bulb", bulb) is profile for bulb in bulbs[1:])
+    assert LightProfiles().get("bulb", bulbs[0]) is not profile
+    assert isinstance(profile.effect_values, tuple)
+    assert isinstance(profile.scene_effect_values, tuple)
+    assert isinstance(profile.supported_color_modes, frozenset)
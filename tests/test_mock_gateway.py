@@ -0,0 +1,91 @@
+"""Gateway client requests against the local mock gateway.
+
+Run:
+    ./scripts/test tests/test_mock_gateway.py
+"""
+
+import asyncio
+
+import pytest
+
+from custom_components.sberdevices.const import ENDPOINT_DEVICE_STATE, ENDPOINT_DEVICE_TREE
+from custom_components.sberdevices.core.gateway import GatewayError, SberHomeGatewayClient
+from scripts.mock_gateway import MockGatewayConfig, MockSberGateway
+
+
+@pytest.mark.asyncio
+async def test_mock_gateway_round_trip(gateway: MockSberGateway, gateway_client: SberHomeGatewayClient) -> None:
+    """Polls survive a server-side token expiry and writes reach the mock devices."""
+    devices = await gateway_client.get_devices()
+    gateway.expire_gateway_tokens()
+    devices = await gateway_client.get_devices()
+
+    device_id = next(iter(devices))
+    await gateway_client.set_device_state(device_id, [{"key": "on_off", "bool_value": True}])
+
+    assert len(devices) == 30
+    assert gateway.requests["/companion/token"] == 2
+    tree_metrics = gateway_client.metrics.endpoint(ENDPOINT_DEVICE_TREE)
+    assert tree_metrics.requests == 3
+    assert tree_metrics.retries == 1
+    assert tree_metrics.errors == {"http 401": 1}
+    assert gateway_client.metrics.endpoint(ENDPOINT_DEVICE_STATE).latency.count == 1
+    on_off = next(state for state in gateway.devices[device_id]["desired_state"] if state["key"] == "on_off")
+    assert on_off["bool_value"] is True
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("gateway_config", [MockGatewayConfig(devices=30, depth=2, token_ttl=1)])
+async def test_mock_gateway_short_lived_token(gateway: MockSberGateway, gateway_client: SberHomeGatewayClient) -> None:
+    """A token living shorter than the refresh margin is not refreshed over and over."""
+    await gateway_client.get_devices()
+    await asyncio.sleep(0.3)
+
+    assert gateway.requests["/companion/token"] == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "gateway_config",
+    [MockGatewayConfig(devices=30, depth=2, etag=False), MockGatewayConfig(devices=30, depth=2, etag=True)],
+    ids=["digest", "etag"],
+)
+async def test_mock_gateway_unchanged_tree(gateway: MockSberGateway, gateway_client: SberHomeGatewayClient) -> None:
+    """An unchanged tree is reported as None, by 304 or by body digest, until the client forgets it."""
+    device_id = next(iter(gateway.devices))
+
+    assert await gateway_client.get_device_tree_if_changed() is not None
+    assert await gateway_client.get_device_tree_if_changed() is None
+
+    gateway_client.forget_device_tree()
+    assert await gateway_client.get_device_tree_if_changed() is not None
+
+    await gateway_client.set_device_state(device_id, [{"key": "on_off", "bool_value": True}])
+    assert await gateway_client.get_device_tree_if_changed() is not None
+
+    tree_metrics = gateway_client.metrics.endpoint(ENDPOINT_DEVICE_TREE)
+    assert (tree_metrics.requests, tree_metrics.unchanged) == (4, 1)
+    assert not tree_metrics.errors
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("gateway_config", [MockGatewayConfig(devices=30, depth=2, latency=0.1)])
+async def test_mock_gateway_group_write(gateway: MockSberGateway, gateway_client: SberHomeGatewayClient) -> None:
+    """A write to several devices goes out in parallel, and a failing device does not stop the others."""
+    device_ids = list(gateway.devices)[:8]
+    command = [{"key": "on_off", "bool_value": True}]
+    loop = asyncio.get_running_loop()
+
+    await gateway_client.get_devices()
+    started = loop.time()
+    await gateway_client.set_devices_state(dict.fromkeys(device_ids, command))
+    elapsed = loop.time() - started
+    with pytest.raises(GatewayError):
+        await gateway_client.set_devices_state({"missing": command, device_ids[0]: command})
+
+    # Eight writes one after another would take 0.8 s.
+    assert elapsed < 0.4
+    assert gateway.requests["PUT state"] == 10
+    for device_id in device_ids:
+        on_off = next(state for state in gateway.devices[device_id]["desired_state"] if state["key"] == "on_off")
+        assert on_off["bool_value"] is True
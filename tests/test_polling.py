@@ -0,0 +1,133 @@
+"""Adaptive poll schedule and the polling engine shared by accounts.
+
+Run:
+    ./scripts/test tests/test_polling.py
+"""
+
+import asyncio
+import copy
+from collections.abc import Callable
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from custom_components.sberdevices.const import COORDINATOR_UPDATE_INTERVAL, POLL_ACTIVE_WINDOW
+from custom_components.sberdevices.core import polling
+from custom_components.sberdevices.core.auth import SberAuthClient
+from custom_components.sberdevices.core.gateway import SberHomeGatewayClient
+from custom_components.sberdevices.core.polling import AdaptivePollSchedule, PollingEngine
+from custom_components.sberdevices.core.snapshot import diff_device_caches, extract_devices
+from custom_components.sberdevices.core.transport import SberHttpTransport
+from scripts.mock_gateway import MockSberGateway
+from scripts.synthetic_home import synthetic_tree
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> FakeClock:
+    fake = FakeClock()
+    monkeypatch.setattr(polling, "time", SimpleNamespace(monotonic=fake.monotonic))
+    return fake
+
+
+def test_adaptive_poll_schedule(clock: FakeClock) -> None:
+    """Only commands poll below the base interval; activity holds it and quiet polls back off."""
+    schedule = AdaptivePollSchedule(timedelta(seconds=10), timedelta(minutes=5))
+    window = POLL_ACTIVE_WINDOW.total_seconds()
+    assert schedule.interval == COORDINATOR_UPDATE_INTERVAL
+
+    assert schedule.record_success(active=True) == COORDINATOR_UPDATE_INTERVAL
+    clock.now += window
+    assert schedule.record_success(active=False) == timedelta(minutes=1)
+    assert schedule.record_success(active=False) == timedelta(minutes=2)
+    assert schedule.record_success(active=False) == timedelta(minutes=4)
+    assert schedule.record_success(active=False) == timedelta(minutes=5)
+
+    assert schedule.mark_active() == timedelta(seconds=10)
+    assert schedule.record_success(active=True) == timedelta(seconds=10)
+    # The device reports the commanded state near the end of the command window.
+    clock.now += window - 1
+    assert schedule.record_success(active=True) == timedelta(seconds=10)
+    # The command window has passed, but the reported activity holds the base interval.
+    clock.now += 2
+    assert schedule.record_success(active=False) == COORDINATOR_UPDATE_INTERVAL
+    clock.now += window
+    assert schedule.record_success(active=False) == timedelta(minutes=1)
+
+    schedule.mark_active()
+    assert schedule.record_failure() == timedelta(seconds=20)
+    assert schedule.record_failure() == timedelta(seconds=40)
+    assert schedule.record_success(active=False) == timedelta(seconds=80)
+
+
+def test_adaptive_poll_schedule_bounds() -> None:
+    """The base interval never drops below the configured minimum or exceeds the maximum."""
+    assert AdaptivePollSchedule(timedelta(minutes=1), timedelta(minutes=5)).base_interval == timedelta(minutes=1)
+    assert AdaptivePollSchedule(timedelta(seconds=5), timedelta(seconds=20)).base_interval == timedelta(seconds=20)
+
+
+def test_meter_drift_is_not_activity() -> None:
+    """Socket meter readings change the diff but do not count as activity."""
+    tree = synthetic_tree(30, depth=2)
+    previous = extract_devices(tree)
+    sockets = [device for device in tree["devices"] if device["image_set_type"] == "dt_socket_sber"]
+
+    drifted = copy.deepcopy(tree)
+    for device in drifted["devices"]:
+        for state in device["reported_state"]:
+            if state["key"] == "cur_power":
+                state["float_value"] += 1.5
+    diff = diff_device_caches(previous, extract_devices(drifted))
+    assert diff.changed == {device["id"] for device in sockets}
+    assert not diff.active
+
+    switched = copy.deepcopy(drifted)
+    on_off = next(state for state in switched["devices"][0]["reported_state"] if state["key"] == "on_off")
+    on_off["bool_value"] = not on_off["bool_value"]
+    assert diff_device_caches(previous, extract_devices(switched)).active
+
+    removed = copy.deepcopy(tree)
+    del removed["devices"][0]
+    assert diff_device_caches(previous, extract_devices(removed)).active
+
+
+@pytest.mark.asyncio
+async def test_shared_polling_engine(
+    gateway: MockSberGateway,
+    make_auth_client: Callable[..., SberAuthClient],
+    make_gateway_client: Callable[..., SberHomeGatewayClient],
+) -> None:
+    """Accounts on one engine share the pool but not tokens, and simultaneous polls are staggered."""
+    engine = PollingEngine(SberHttpTransport(), max_concurrency=2, stagger=0.2)
+    auth_clients = [make_auth_client(transport=engine.transport) for _ in range(2)]
+    gateway_clients = [make_gateway_client(auth_client) for auth_client in auth_clients]
+    loop = asyncio.get_running_loop()
+    started: list[float] = []
+
+    async def poll(gateway_client: SberHomeGatewayClient) -> None:
+        async with engine.poll_slot():
+            started.append(loop.time())
+            await gateway_client.get_devices()
+
+    try:
+        await asyncio.gather(*(poll(gateway_client) for gateway_client in gateway_clients))
+        # Closing one account's clients leaves the shared pool open for the other.
+        await gateway_clients[0].async_close()
+        await auth_clients[0].async_close()
+        devices = await gateway_clients[1].get_devices()
+    finally:
+        await engine.async_close()
+
+    assert len(devices) == 30
+    assert started[1] - started[0] >= 0.2
+    assert (engine.polls, engine.delayed) == (2, 1)
+    assert gateway.requests["/companion/token"] == 2
+    assert gateway_clients[0]._gateway_token != gateway_clients[1]._gateway_token
@@ -0,0 +1,132 @@
+"""Socket meter sensors: value conversion, the write threshold and energy integration.
+
+Run:
+    ./scripts/test tests/test_sensor.py
+"""
+
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+from custom_components.sberdevices import sensor
+from custom_components.sberdevices.core.snapshot import (
+    DeviceCache,
+    apply_device_state_event,
+    decode_state_value,
+    extract_devices,
+)
+from custom_components.sberdevices.sensor import (
+    SOCKET_ENERGY_SENSOR,
+    STATE_SENSORS,
+    SberSocketEnergySensorEntity,
+    SberStateSensorEntity,
+)
+from scripts.synthetic_home import synthetic_tree
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> FakeClock:
+    fake = FakeClock()
+    monkeypatch.setattr(sensor, "time", SimpleNamespace(monotonic=fake.monotonic))
+    return fake
+
+
+@pytest.fixture
+def devices() -> DeviceCache:
+    return extract_devices(synthetic_tree(30, depth=2))
+
+
+def socket_id(devices: DeviceCache) -> str:
+    return next(device.id for device in devices.values() if device.image_set_type == "dt_socket_sber")
+
+
+def report(devices: DeviceCache, device_id: str, *states: dict[str, Any]) -> None:
+    apply_device_state_event(devices, {"device_id": device_id, "reported_state": list(states)})
+
+
+def add_entity[T: SberStateSensorEntity](entity: T) -> tuple[T, list[float | None]]:
+    """Stand in for the entity platform: record the values the entity writes."""
+    written: list[float | None] = []
+    entity.async_write_ha_state = lambda: written.append(entity.native_value)
+    entity._handle_coordinator_update()
+    return entity, written
+
+
+def test_decode_float_value() -> None:
+    """An integral FLOAT stays a float, so it is not mistaken for an INTEGER reading."""
+    assert decode_state_value({"key": "cur_current", "type": "FLOAT", "float_value": 1}) == 1.0
+    assert isinstance(decode_state_value({"key": "cur_current", "type": "FLOAT", "float_value": 1}), float)
+    assert isinstance(decode_state_value({"key": "cur_current", "float_value": 2}), float)
+    assert decode_state_value({"key": "cur_current", "type": "INTEGER", "integer_value": "1500"}) == 1500
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_current_conversion(compact: bool) -> None:
+    """Integer current is reported in mA and float current in A."""
+    devices = extract_devices(synthetic_tree(30, depth=2), compact=compact)
+    device_id = socket_id(devices)
+    coordinator = SimpleNamespace(data=devices, last_update_success=True)
+    entity, written = add_entity(SberStateSensorEntity(coordinator, device_id, STATE_SENSORS["cur_current"]))
+
+    report(devices, device_id, {"key": "cur_current", "type": "INTEGER", "integer_value": "1500"})
+    entity._handle_coordinator_update()
+    report(devices, device_id, {"key": "cur_current", "type": "FLOAT", "float_value": 1})
+    entity._handle_coordinator_update()
+
+    assert written[-2:] == [1.5, 1.0]
+
+
+def test_threshold_filter(devices: DeviceCache) -> None:
+    """Readings within the threshold of the last written value are not written; availability always is."""
+    device_id = socket_id(devices)
+    coordinator = SimpleNamespace(data=devices, last_update_success=True)
+    report(devices, device_id, {"key": "cur_power", "type": "FLOAT", "float_value": 100.0})
+    entity, written = add_entity(SberStateSensorEntity(coordinator, device_id, STATE_SENSORS["cur_power"]))
+
+    for power in (101.0, 98.5, 101.9):
+        report(devices, device_id, {"key": "cur_power", "type": "FLOAT", "float_value": power})
+        entity._handle_coordinator_update()
+    assert written == [100.0]
+    assert entity.native_value == 101.9
+
+    report(devices, device_id, {"key": "cur_power", "type": "FLOAT", "float_value": 102.0})
+    entity._handle_coordinator_update()
+    report(devices, device_id, {"key": "online", "type": "BOOL", "bool_value": False})
+    entity._handle_coordinator_update()
+    assert written == [100.0, 102.0, 102.0]
+    assert not entity.available
+
+
+def test_energy_integration(devices: DeviceCache, clock: FakeClock) -> None:
+    """Each power reading is held until the next one, and offline time is not counted."""
+    device_id = socket_id(devices)
+    coordinator = SimpleNamespace(data=devices, last_update_success=True)
+    report(devices, device_id, {"key": "cur_power", "type": "FLOAT", "float_value": 1000.0})
+    entity, written = add_entity(SberSocketEnergySensorEntity(coordinator, device_id, SOCKET_ENERGY_SENSOR))
+
+    clock.now += 1800
+    report(devices, device_id, {"key": "cur_power", "type": "FLOAT", "float_value": 2000.0})
+    entity._handle_coordinator_update()
+    clock.now += 900
+    entity._handle_coordinator_update()
+    assert entity.native_value == 1.0
+
+    report(devices, device_id, {"key": "online", "type": "BOOL", "bool_value": False})
+    entity._handle_coordinator_update()
+    clock.now += 3600
+    report(devices, device_id, {"key": "online", "type": "BOOL", "bool_value": True})
+    entity._handle_coordinator_update()
+    clock.now += 36
+    entity._handle_coordinator_update()
+
+    assert entity.native_value == 1.02
+    assert written == [0.0, 0.5, 1.0, 1.0, 1.0, 1.02]
@@ -0,0 +1,105 @@
+"""Per-device state write coalescing.
+
+Run:
+    ./scripts/test tests/test_write_queue.py
+"""
+
+import asyncio
+import itertools
+
+import pytest
+
+from custom_components.sberdevices.core.gateway import DeviceStateWriteQueue
+from custom_components.sberdevices.core.snapshot import DeviceState
+
+FLUSH_INTERVAL = 0.05
+
+
+def on_off(value: bool) -> list[DeviceState]:
+    return [{"key": "on_off", "type": "BOOL", "bool_value": value}]
+
+
+def brightness(value: int) -> list[DeviceState]:
+    return [{"key": "light_brightness", "type": "INTEGER", "integer_value": str(value)}]
+
+
+class RecordingSender:
+    """Write target that records every batch with the loop time it was sent at."""
+
+    def __init__(self, latency: float = 0.0) -> None:
+        self.latency = latency
+        self.sent: list[tuple[str, list[DeviceState], float]] = []
+        self.failing: set[str] = set()
+
+    async def __call__(self, device_id: str, states: list[DeviceState]) -> None:
+        self.sent.append((device_id, states, asyncio.get_running_loop().time()))
+        await asyncio.sleep(self.latency)
+        if device_id in self.failing:
+            raise RuntimeError(device_id)
+
+
+@pytest.mark.asyncio
+async def test_write_queue_merges_last_write_wins() -> None:
+    """Writes behind an in-flight batch merge into one, with the last value of each key winning."""
+    send = RecordingSender(latency=0.01)
+    queue = DeviceStateWriteQueue(send, flush_interval=FLUSH_INTERVAL)
+
+    first = asyncio.create_task(queue.write("bulb", on_off(True)))
+    await asyncio.sleep(0.005)
+    await asyncio.gather(
+        queue.write("bulb", brightness(100)),
+        queue.write("bulb", on_off(False)),
+        queue.write("bulb", brightness(300)),
+    )
+    await first
+
+    assert [states for _, states, _ in send.sent] == [on_off(True), on_off(False) + brightness(300)]
+
+
+@pytest.mark.asyncio
+async def test_write_queue_flush_rate_and_order() -> None:
+    """Batches of one device keep their order and are at least the flush interval apart."""
+    send = RecordingSender()
+    queue = DeviceStateWriteQueue(send, flush_interval=FLUSH_INTERVAL)
+
+    for value in range(3):
+        await queue.write("bulb", brightness(value))
+
+    assert [states for _, states, _ in send.sent] == [brightness(0), brightness(1), brightness(2)]
+    started = [sent_at for _, _, sent_at in send.sent]
+    assert all(later - earlier >= FLUSH_INTERVAL * 0.9 for earlier, later in itertools.pairwise(started))
+
+
+@pytest.mark.asyncio
+async def test_write_queue_devices_are_independent() -> None:
+    """Devices flush concurrently, and each caller gets its own device's result."""
+    send = RecordingSender(latency=0.01)
+    send.failing.add("socket")
+    queue = DeviceStateWriteQueue(send, flush_interval=FLUSH_INTERVAL, max_concurrency=2)
+
+    results = await asyncio.gather(
+        queue.write("bulb", on_off(True)),
+        queue.write("socket", on_off(True)),
+        return_exceptions=True,
+    )
+
+    assert results[0] is None
+    assert isinstance(results[1], RuntimeError)
+    assert abs(send.sent[0][2] - send.sent[1][2]) < FLUSH_INTERVAL
+
+
+@pytest.mark.asyncio
+async def test_write_queue_close_releases_callers() -> None:
+    """Closing the queue cancels both the in-flight batch and the one waiting behind it."""
+    send = RecordingSender(latency=10)
+    queue = DeviceStateWriteQueue(send, flush_interval=FLUSH_INTERVAL)
+    in_flight = asyncio.create_task(queue.write("bulb", on_off(True)))
+    await asyncio.sleep(0)
+    queued = asyncio.create_task(queue.write("bulb", on_off(False)))
+    await asyncio.sleep(0)
+
+    await queue.async_close()
+
+    async with asyncio.timeout(1):
+        results = await asyncio.gather(in_flight, queued, return_exceptions=True)
+    assert all(isinstance(result, asyncio.CancelledError) for result in results)